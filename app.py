@@ -1,67 +1,1715 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
-from flask_migrate import Migrate
-from models import db, Account, EmailConfig, LoginLog, ScheduledTask
+import time
+from collections import OrderedDict, deque
+
+# 启动耗时统计（毫秒），用于查看冷启动时间花在哪些阶段
+startup_timings = OrderedDict()
+_startup_begin = _startup_mark = time.perf_counter()
+
+def record_startup(stage, started=None):
+    global _startup_mark
+    now = time.perf_counter()
+    startup_timings[stage] = round((now - (started if started is not None else _startup_mark)) * 1000, 1)
+    if started is None:
+        _startup_mark = now
+
+from flask import Flask, Response, stream_with_context, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
+record_startup('import_flask')
+from flask_migrate import Migrate, upgrade
+record_startup('import_flask_migrate')
+from models import db, Account, AccountStats, EmailConfig, LoginLog, LoginLogDaily, ClubSnapshot, ScheduledTask, SchedulerLock, \
+    CacheVersion
+record_startup('import_models')
 from config import Config
 import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import insert, select, update, or_, func, case, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, defer
+record_startup('import_requests')
+# ddddocr 和 cryptography 体积较大，在首次使用或后台预热时才导入
 import base64
-import ddddocr
 import json
-import time
 import re
-from cryptography.hazmat.primitives import serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.backends import default_backend
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 import sys
 import logging
+import logging.handlers
+import contextvars
+import shutil
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.base import STATE_RUNNING, STATE_STOPPED
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.events import EVENT_ALL_JOBS_REMOVED, EVENT_JOB_ADDED, EVENT_JOB_REMOVED, EVENT_JOB_MODIFIED, \
+    EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+record_startup('import_apscheduler')
 import smtplib
 from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from email.mime.application import MIMEApplication
 from email.header import Header
 import threading
+import queue
 import atexit
+import uuid
+import hashlib
+import socket
+import gzip
+import io
+import csv
+import codecs
+import heapq
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+record_startup('import_stdlib')
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 # 初始化数据库
 db.init_app(app)
-migrate = Migrate(app, db)
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+
+# SQLite每个新连接都设置：WAL模式让读不阻塞写，synchronous=NORMAL减少fsync，
+# busy_timeout让写锁冲突时等待而不是立即报 database is locked
+def configure_sqlite_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(Config.DB_BUSY_TIMEOUT * 1000)}")
+    cursor.close()
 
-# 初始化OCR识别器
-ocr = ddddocr.DdddOcr()
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', configure_sqlite_connection)
+record_startup('app_init')
 
 # 创建日志目录
 if not os.path.exists(Config.LOG_DIR):
     os.makedirs(Config.LOG_DIR)
 
-# 设置日志
+# 设置日志：日志记录先放入队列，由后台线程写入文件和控制台，登录线程不做磁盘IO。
+# 文件日志为每行一个JSON对象，按日期写入 login_<日期>.log
+LOG_FILE_PATTERN = 'login_{day}.log'
+
+def log_file_path(day):
+    return os.path.join(Config.LOG_DIR, LOG_FILE_PATTERN.format(day=day))
+
+# 当前线程正在处理的账号、尝试次数和阶段，由 LogContextFilter 附加到每条日志
+log_context = contextvars.ContextVar('log_context', default={})
+
+def update_log_context(**fields):
+    log_context.set(dict(log_context.get(), **fields))
+
+class LogContextFilter(logging.Filter):
+    def filter(self, record):
+        for key, value in log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    CONTEXT_FIELDS = ('account', 'account_id', 'attempt', 'phase')
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        for field in self.CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        # QueueHandler 入队前已把异常堆栈合并到 message 中
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+# 以追加方式写入当天的日志文件，日期变化时改为打开新文件；不重命名文件，
+# 多个 worker 进程可以同时写同一个文件，旧文件的压缩和清理由 compress_log_files 完成
+class DailyFileHandler(logging.FileHandler):
+    def __init__(self):
+        self.day = datetime.now().strftime('%Y-%m-%d')
+        super().__init__(log_file_path(self.day), encoding='utf-8', delay=True)
+    
+    def emit(self, record):
+        day = datetime.now().strftime('%Y-%m-%d')
+        if day != self.day:
+            # 只关闭文件流，不调用 close()，处理器仍然注册在 logging 中；下一次写入时打开新日期的文件
+            self.day = day
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = log_file_path(day)
+        super().emit(record)
+
 def setup_logging():
-    today = datetime.now().strftime("%Y-%m-%d")
-    log_file = os.path.join(Config.LOG_DIR, f"login_{today}.log")
-    
-    logging.basicConfig(
-        level=getattr(logging, Config.LOG_LEVEL),
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
-    return logging.getLogger("AutoLogin")
+    text_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    
+    file_handler = DailyFileHandler()
+    file_handler.setFormatter(JsonLogFormatter() if Config.LOG_FORMAT == 'json' else text_formatter)
+    
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(text_formatter)
+    
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # 入队前只合并参数和异常堆栈，格式由各输出决定
+    queue_handler.addFilter(LogContextFilter())
+    listener = logging.handlers.QueueListener(queue_handler.queue, file_handler, console_handler,
+                                              respect_handler_level=True)
+    listener.start()
+    # 最先注册、最后执行，退出前写完队列中剩余的日志
+    atexit.register(listener.stop)
+    
+    logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL), handlers=[queue_handler])
+    return logging.getLogger("AutoLogin"), listener
+
+logger, log_listener = setup_logging()
+record_startup('logging')
 
-logger = setup_logging()
+# 登录接口地址
+CMS_API_URL = "https://cmsapi3.qiucheng-wangluo.com/cms-api"
 
 # 固定公钥（用于第一次加密）
 FIRST_PUBLIC_KEY = "MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQDNR7I+SpqIZM5w3Aw4lrUlhrs7VurKbeViYXNhOfIgP/4acsWvJy5dPb/FejzUiv2cAiz5As2DJEQYEM10LvnmpnKx9Dq+QDo7WXnT6H2szRtX/8Q56Rlzp9bJMlZy7/i0xevlDrWZMWqx2IK3ZhO9+0nPu4z4SLXaoQGIrs7JxwIDAQAB"
 
+# 解析公钥（支持PEM、Base64 DER、十六进制DER）
+def parse_public_key(key_str):
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.backends import default_backend
+        
+        if "-----BEGIN" in key_str:
+            return serialization.load_pem_public_key(key_str.encode(), backend=default_backend())
+        else:
+            try:
+                der_data = base64.b64decode(key_str)
+                return serialization.load_der_public_key(der_data, backend=default_backend())
+            except:
+                hex_str = re.sub(r'\s+', '', key_str)
+                if len(hex_str) % 2 != 0:
+                    hex_str = '0' + hex_str
+                der_data = bytes.fromhex(hex_str)
+                return serialization.load_der_public_key(der_data, backend=default_backend())
+    except Exception as e:
+        logger.error(f"加载公钥时发生异常: {str(e)}")
+        return None
+
+# 公钥缓存：按公钥字符串缓存解析后的RSAPublicKey（LRU），固定公钥常驻不淘汰
+class PublicKeyCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.pinned = {}
+        self.keys = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def pin(self, key_str):
+        public_key = parse_public_key(key_str)
+        if public_key is not None:
+            with self.lock:
+                self.pinned[key_str] = public_key
+        return public_key
+
+    def get(self, key_str):
+        with self.lock:
+            public_key = self.pinned.get(key_str) or self.keys.get(key_str)
+            if public_key is not None:
+                if key_str in self.keys:
+                    self.keys.move_to_end(key_str)
+                self.hits += 1
+                return public_key
+            self.misses += 1
+        
+        public_key = parse_public_key(key_str)
+        if public_key is not None:
+            with self.lock:
+                self.keys[key_str] = public_key
+                self.keys.move_to_end(key_str)
+                while len(self.keys) > self.maxsize:
+                    self.keys.popitem(last=False)
+        return public_key
+
+    def discard(self, key_str):
+        with self.lock:
+            self.keys.pop(key_str, None)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.keys),
+                'pinned': len(self.pinned),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+public_key_cache = PublicKeyCache(Config.RSA_KEY_CACHE_SIZE)
+
+# 验证码识别服务：由多个ddddocr实例组成模型池，每个实例由一个工作线程独占
+# （ddddocr实例不是线程安全的），识别请求进入队列，空闲的工作线程逐个取出处理。
+# 每个模型占用几十MB内存，只在排队请求没有空闲线程处理时才加载新模型
+class CaptchaRecognizer:
+    def __init__(self, pool_size, timeout):
+        self.pool_size = max(1, pool_size)
+        self.timeout = timeout
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.idle = 0
+        self.models_loaded = 0
+        self.load_failures = 0
+        self.recognized = 0
+        self.failed = 0
+        self.confidence_total = 0.0
+
+    def start(self, count=1):
+        with self.lock:
+            self._spawn(min(count, self.pool_size))
+
+    def _spawn(self, count):
+        # 调用方持有 self.lock
+        while len(self.workers) < count:
+            worker = threading.Thread(target=self._worker, name=f'ocr-{len(self.workers)}', daemon=True)
+            self.workers.append(worker)
+            worker.start()
+
+    def recognize(self, image):
+        """识别验证码图片，返回 (文本, 置信度)"""
+        item = {'image': image, 'event': threading.Event(), 'result': None, 'error': None}
+        # 补齐工作线程和入队在同一把锁内，加载失败退出的线程不会留下无人处理的请求
+        with self.lock:
+            if self.idle <= self.requests.qsize():
+                self._spawn(min(len(self.workers) + 1, self.pool_size))
+            self.requests.put(item)
+        if not item['event'].wait(self.timeout):
+            raise TimeoutError(f"验证码识别超时({self.timeout}秒)")
+        if item['error'] is not None:
+            raise item['error']
+        return item['result']
+
+    def _worker(self):
+        started = time.perf_counter()
+        try:
+            import ddddocr
+            model = ddddocr.DdddOcr(show_ad=False)
+        except Exception as e:
+            logger.error(f"加载OCR模型失败: {str(e)}")
+            # 退出模型池，下次识别时重新创建；没有其他工作线程时让排队的请求立即失败
+            with self.lock:
+                self.load_failures += 1
+                self.workers.remove(threading.current_thread())
+                if not self.workers:
+                    while True:
+                        try:
+                            item = self.requests.get_nowait()
+                        except queue.Empty:
+                            break
+                        item['error'] = e
+                        item['event'].set()
+            return
+        
+        with self.lock:
+            self.models_loaded += 1
+            if self.models_loaded == 1:
+                record_startup('ocr_first_model_load', started)
+        
+        while True:
+            with self.lock:
+                self.idle += 1
+            item = self.requests.get()
+            with self.lock:
+                self.idle -= 1
+            try:
+                item['result'] = self._classify(model, item['image'])
+            except Exception as e:
+                item['error'] = e
+            item['event'].set()
+            
+            with self.lock:
+                if item['error'] is None:
+                    self.recognized += 1
+                    self.confidence_total += item['result'][1]
+                else:
+                    self.failed += 1
+
+    @staticmethod
+    def _classify(model, image):
+        import numpy as np
+        
+        result = model.classification(image, probability=True)
+        # 不同版本的ddddocr返回的字段名不同
+        charset = result.get('charsets') or result.get('charset')
+        probabilities = result.get('probability')
+        if probabilities is None:
+            probabilities = result.get('probabilities')
+        
+        rows = np.asarray(probabilities, dtype=np.float32).reshape(-1, len(charset))
+        indices = rows.argmax(axis=1)
+        
+        # CTC解码：合并连续重复字符并去掉空白符，同时保留每个字符的概率
+        chars = []
+        last_index = None
+        for row, index in zip(rows, indices):
+            if index != last_index and charset[index]:
+                char = charset[index]
+                if re.match(r'^[a-zA-Z0-9]$', char):
+                    chars.append((char.upper(), float(row[index])))
+            last_index = index
+        
+        chars = chars[:4]
+        text = ''.join(char for char, _ in chars)
+        # 以最不确定的字符概率作为整体置信度
+        confidence = min(p for _, p in chars) if chars else 0.0
+        return text, confidence
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pool_size': self.pool_size,
+                'models_loaded': self.models_loaded,
+                'idle_workers': self.idle,
+                'load_failures': self.load_failures,
+                'queue_size': self.requests.qsize(),
+                'recognized': self.recognized,
+                'failed': self.failed,
+                'avg_confidence': round(self.confidence_total / self.recognized, 4) if self.recognized else None
+            }
+
+captcha_recognizer = CaptchaRecognizer(
+    Config.OCR_POOL_SIZE,
+    Config.OCR_TIMEOUT
+)
+
+# 登录尝试统计：记录每次尝试的上游往返次数、验证码刷新次数和结果，
+# 用于衡量每次成功登录平均需要多少次往返
+class LoginStats:
+    def __init__(self, history_size=200):
+        self.lock = threading.Lock()
+        self.history = deque(maxlen=history_size)
+        self.totals = {
+            'attempts': 0,
+            'successes': 0,
+            'round_trips': 0,
+            'captcha_refreshes': 0,
+            'captcha_rejected': 0,
+            'session_reused': 0
+        }
+
+    def record(self, account_name, attempt, outcome, round_trips, refreshes=0, confidence=None):
+        with self.lock:
+            self.totals['attempts'] += 1
+            self.totals['round_trips'] += round_trips
+            self.totals['captcha_refreshes'] += refreshes
+            if outcome in ('success', 'session_reused'):
+                self.totals['successes'] += 1
+            if outcome == 'session_reused':
+                self.totals['session_reused'] += 1
+            elif outcome == 'captcha_rejected':
+                self.totals['captcha_rejected'] += 1
+            self.history.append({
+                'account_name': account_name,
+                'attempt': attempt,
+                'outcome': outcome,
+                'round_trips': round_trips,
+                'captcha_refreshes': refreshes,
+                'confidence': round(confidence, 4) if confidence is not None else None,
+                'time': datetime.now().isoformat()
+            })
+
+    def stats(self):
+        with self.lock:
+            successes = self.totals['successes']
+            return dict(
+                self.totals,
+                round_trips_per_success=round(self.totals['round_trips'] / successes, 2) if successes else None,
+                recent_attempts=list(self.history)[-20:]
+            )
+
+login_stats = LoginStats()
+
+# 读接口响应缓存：缓存序列化后的响应体，ETag由相关数据表的版本计算，
+# 客户端带 If-None-Match 且数据未变化时直接返回304；写接口通过 invalidate 使缓存失效：
+# 本进程的缓存立即删除，数据库中的版本递增，其他进程在缓存到期后重新校验版本时发现变化
+class ResponseCache:
+    def __init__(self, ttl, maxsize):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def invalidate(self, *tables):
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if set(entry['tables']) & set(tables)]:
+                del self.entries[key]
+        shared = [table for table in tables if table in CACHE_TABLES]
+        if shared:
+            bump_cache_versions(shared)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            entry['expires_at'] = time.monotonic() + self.ttl
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def count(self, outcome):
+        with self.lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses
+            }
+
+response_cache = ResponseCache(Config.RESPONSE_CACHE_TTL, Config.RESPONSE_CACHE_SIZE)
+
+# 事件中心：新的登录日志、后台任务和定时任务状态变化通过SSE推送给仪表盘。
+# 事件按递增ID保存在有限长度的历史中，客户端断线重连时凭 Last-Event-ID 续传。
+# 事件ID带有本进程的标识，重连到其他进程（如另一个gunicorn worker）时无法续传，通知客户端重新拉取
+class EventBroker:
+    def __init__(self, history_size):
+        self.condition = threading.Condition()
+        self.history = deque(maxlen=history_size)
+        self.last_id = 0
+        self.epoch = uuid.uuid4().hex[:8]
+        self.subscribers = 0
+        self.local_log_ids = deque(maxlen=history_size)  # 本进程写入并已推送的日志ID
+
+    def publish(self, name, data):
+        with self.condition:
+            self.last_id += 1
+            self.history.append((self.last_id, name, data))
+            if name == 'log':
+                self.local_log_ids.append(data['id'])
+            self.condition.notify_all()
+
+    def event_id(self, last_id):
+        return f"{self.epoch}-{last_id}"
+
+    def parse_event_id(self, event_id):
+        """解析客户端带回的事件ID，不是本进程产生的返回None"""
+        epoch, _, last_id = (event_id or '').partition('-')
+        if epoch != self.epoch or not last_id.isdigit():
+            return None
+        return int(last_id)
+
+    def subscribe(self):
+        with self.condition:
+            self.subscribers += 1
+
+    def unsubscribe(self):
+        with self.condition:
+            self.subscribers -= 1
+
+    def can_resume(self, last_id):
+        # 需要的事件已经被挤出历史时无法续传
+        with self.condition:
+            if last_id > self.last_id:
+                return False
+            return not self.history or last_id >= self.history[0][0] - 1
+
+    def wait_for_events(self, last_id, timeout):
+        with self.condition:
+            if self.last_id <= last_id:
+                self.condition.wait(timeout)
+            return [item for item in self.history if item[0] > last_id]
+
+event_broker = EventBroker(Config.SSE_HISTORY_SIZE)
+
+# 登录日志批量写入器：日志先缓存在内存中，达到条数或时间阈值时由后台线程批量插入，
+# 减少SQLite的提交（fsync）次数和写锁占用
+# 每个账号保留的失败原因种类上限，超出时丢弃次数最少的
+MAX_FAILURE_REASONS = 20
+
+def update_account_stats(rows):
+    """按一批新写入的登录日志增量更新账号统计，与日志在同一事务中提交"""
+    groups = {}
+    for row in rows:
+        if row.get('account_id') is None:
+            continue
+        group = groups.setdefault(row['account_id'], {
+            'attempts': 0, 'successes': 0, 'reasons': {}, 'latency_total_ms': 0.0, 'latency_count': 0,
+            'last_attempt_at': None, 'last_success_at': None, 'last_failure_at': None
+        })
+        created_at = row['created_at']
+        group['attempts'] += 1
+        group['last_attempt_at'] = max(group['last_attempt_at'] or created_at, created_at)
+        if row['status'] == 'success':
+            group['successes'] += 1
+            group['last_success_at'] = max(group['last_success_at'] or created_at, created_at)
+        else:
+            reason = (row.get('message') or '未知错误')[:100]
+            group['reasons'][reason] = group['reasons'].get(reason, 0) + 1
+            group['last_failure_at'] = max(group['last_failure_at'] or created_at, created_at)
+        if row.get('latency_ms') is not None:
+            group['latency_total_ms'] += row['latency_ms']
+            group['latency_count'] += 1
+    if not groups:
+        return
+    
+    for account_id, group in groups.items():
+        values = {
+            'attempts': AccountStats.attempts + group['attempts'],
+            'successes': AccountStats.successes + group['successes'],
+            'failures': AccountStats.failures + (group['attempts'] - group['successes']),
+            'latency_total_ms': AccountStats.latency_total_ms + group['latency_total_ms'],
+            'latency_count': AccountStats.latency_count + group['latency_count'],
+        }
+        for field in ('last_attempt_at', 'last_success_at', 'last_failure_at'):
+            value = group[field]
+            if value is not None:
+                column = getattr(AccountStats, field)
+                values[field] = case((or_(column.is_(None), column < value), value), else_=column)
+        # 计数在数据库中原子累加，多个进程同时写入也不会丢失增量
+        statement = update(AccountStats).where(AccountStats.account_id == account_id) \
+            .values(**values).execution_options(synchronize_session=False)
+        if db.session.execute(statement).rowcount == 0:
+            # 统计行不存在时先插入空行；插入放在保存点中，并发插入冲突时只回滚保存点，不影响本批日志
+            try:
+                with db.session.begin_nested():
+                    db.session.add(AccountStats(account_id=account_id, attempts=0, successes=0, failures=0,
+                                                latency_total_ms=0, latency_count=0))
+            except IntegrityError:
+                pass
+            db.session.execute(statement)
+        if group['reasons']:
+            # 上面的 UPDATE 已经锁住该行，直到本事务提交，此时读改写失败原因不会与其他进程交错
+            current = db.session.query(AccountStats.failure_reasons).filter_by(account_id=account_id).scalar()
+            reasons = json.loads(current) if current else {}
+            for reason, count in group['reasons'].items():
+                reasons[reason] = reasons.get(reason, 0) + count
+            reasons = dict(sorted(reasons.items(), key=lambda item: -item[1])[:MAX_FAILURE_REASONS])
+            db.session.execute(update(AccountStats).where(AccountStats.account_id == account_id)
+                               .values(failure_reasons=json.dumps(reasons, ensure_ascii=False))
+                               .execution_options(synchronize_session=False))
+
+class LoginLogWriter:
+    def __init__(self, flush_size, flush_interval):
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.max_buffer = self.flush_size * 50
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.rows_written = 0
+        self.flushes = 0
+        self.dropped = 0
+
+    def add(self, **fields):
+        fields.setdefault('created_at', datetime.utcnow())
+        with self.lock:
+            self.buffer.append(fields)
+            full = len(self.buffer) >= self.flush_size
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+                self.thread.start()
+        if full:
+            self.wakeup.set()
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                rows, self.buffer = self.buffer, []
+            if not rows:
+                return 0
+            
+            with app.app_context():
+                try:
+                    written = list(zip(self._write(rows), rows))
+                except IntegrityError:
+                    # 有违反约束的行（如登录过程中账号被删除），逐条重试找出并丢弃，避免整批反复失败
+                    db.session.rollback()
+                    written = self._write_each(rows)
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"批量写入登录日志失败: {str(e)}")
+                    self._requeue(rows)
+                    return 0
+                if not written:
+                    return 0
+                response_cache.invalidate('login_logs')
+                account_names = dict(
+                    db.session.query(Account.id, Account.name)
+                    .filter(Account.id.in_({row['account_id'] for _, row in written}))
+                    .all()
+                )
+            
+            with self.lock:
+                self.rows_written += len(written)
+                self.flushes += 1
+            
+            for log_id, row in written:
+                event_broker.publish('log', {
+                    'id': log_id,
+                    'account_id': row['account_id'],
+                    'account_name': account_names.get(row['account_id']),
+                    'status': row['status'],
+                    'message': row['message'],
+                    'created_at': row['created_at'].isoformat()
+                })
+            return len(written)
+
+    def _write(self, rows):
+        # latency_ms 只用于统计，不写入日志表
+        log_ids = db.session.execute(
+            insert(LoginLog).returning(LoginLog.id, sort_by_parameter_order=True),
+            [{key: value for key, value in row.items() if key != 'latency_ms'} for row in rows]
+        ).scalars().all()
+        update_account_stats(rows)
+        db.session.commit()
+        return log_ids
+
+    def _write_each(self, rows):
+        written = []
+        for index, row in enumerate(rows):
+            try:
+                written += zip(self._write([row]), [row])
+            except IntegrityError as e:
+                db.session.rollback()
+                self.dropped += 1
+                logger.error(f"登录日志违反数据约束，已丢弃 (账号ID {row.get('account_id')}): {str(e)}")
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"写入登录日志失败: {str(e)}")
+                self._requeue(rows[index:])
+                break
+        return written
+
+    def _requeue(self, rows):
+        # 放回缓存等待下次写入，超过上限时丢弃最旧的日志
+        with self.lock:
+            self.buffer = (rows + self.buffer)[-self.max_buffer:]
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'buffered': len(self.buffer),
+                'rows_written': self.rows_written,
+                'flushes': self.flushes,
+                'dropped': self.dropped
+            }
+
+login_log_writer = LoginLogWriter(Config.LOG_FLUSH_SIZE, Config.LOG_FLUSH_INTERVAL)
+
+# 正在登录中的账号：保证同一账号同一时间只有一个登录流程
+class InflightAccounts:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.account_ids = set()
+
+    def claim(self, account_id):
+        with self.lock:
+            if account_id in self.account_ids:
+                return False
+            self.account_ids.add(account_id)
+            return True
+
+    def release(self, account_id):
+        with self.lock:
+            self.account_ids.discard(account_id)
+
+inflight_accounts = InflightAccounts()
+
+# 后台任务队列：固定数量的工作线程执行任务；相同key的任务同时只允许一个排队或执行，
+# 队列满时 submit 抛出 queue.Full，由调用方返回429
+class JobQueue:
+    def __init__(self, workers, max_pending, history_size):
+        self.workers = workers
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.active_keys = {}
+        self.threads = []
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f'job-{len(self.threads)}', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def submit(self, key, description, func):
+        """提交任务，返回 (任务, 是否新建)；已有相同key的任务时直接返回该任务"""
+        self.start()
+        with self.lock:
+            active_id = self.active_keys.get(key)
+            if active_id is not None:
+                return self.jobs[active_id], False
+            
+            job = {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'description': description,
+                'status': 'queued',
+                'progress': {'done': 0, 'total': None},
+                'result': None,
+                'error': None,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None
+            }
+            self.pending.put_nowait((job, func))
+            self.jobs[job['id']] = job
+            self.active_keys[key] = job['id']
+            self._trim()
+        self._publish(job)
+        return job, True
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job, progress=dict(job['progress'])) if job else None
+
+    def list(self):
+        with self.lock:
+            return [dict(job, progress=dict(job['progress'])) for job in reversed(self.jobs.values())]
+
+    def update_progress(self, job, done, total):
+        with self.lock:
+            job['progress'] = {'done': done, 'total': total}
+        self._publish(job)
+
+    def _publish(self, job):
+        with self.lock:
+            snapshot = dict(job, progress=dict(job['progress']))
+        event_broker.publish('job', snapshot)
+
+    def _trim(self):
+        # 只淘汰已结束的任务
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('succeeded', 'failed')]
+        for job_id in finished[:max(0, len(self.jobs) - self.history_size)]:
+            del self.jobs[job_id]
+
+    def _worker(self):
+        while True:
+            job, func = self.pending.get()
+            with self.lock:
+                job['status'] = 'running'
+                job['started_at'] = datetime.now().isoformat()
+            self._publish(job)
+            try:
+                result = func(job)
+                status, error = 'succeeded', None
+            except Exception as e:
+                logger.error(f"任务 {job['description']} 执行失败: {str(e)}")
+                result, status, error = None, 'failed', str(e)
+            with self.lock:
+                job['status'] = status
+                job['result'] = result
+                job['error'] = error
+                job['finished_at'] = datetime.now().isoformat()
+                if self.active_keys.get(job['key']) == job['id']:
+                    del self.active_keys[job['key']]
+            self._publish(job)
+
+    def stats(self):
+        with self.lock:
+            statuses = [job['status'] for job in self.jobs.values()]
+            return {
+                'workers': self.workers,
+                'queued': statuses.count('queued'),
+                'running': statuses.count('running'),
+                'tracked': len(statuses)
+            }
+
+job_queue = JobQueue(Config.JOB_WORKERS, Config.JOB_QUEUE_SIZE, Config.JOB_HISTORY_SIZE)
+
+# 按主机的自适应令牌桶限速器：每个主机按当前速率补充令牌，最多积累 burst 个。
+# 上游返回429/5xx或请求异常时速率减半，请求正常时每次增加最大速率的1/10，直到恢复最大速率（AIMD）
+class HostRateLimiter:
+    def __init__(self, rate, min_rate=None, burst=1):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate) if min_rate else rate
+        self.burst = max(1, burst)
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def _bucket(self, host, now):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = {'rate': self.max_rate, 'tokens': self.burst, 'updated': now}
+        return bucket
+
+    def acquire(self, url):
+        if self.max_rate <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            bucket = self._bucket(host, now)
+            bucket['tokens'] = min(self.burst, bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+            bucket['updated'] = now
+            # 令牌不足时预支，之后的请求排在后面等待
+            bucket['tokens'] -= 1
+            wait = -bucket['tokens'] / bucket['rate'] if bucket['tokens'] < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, url, throttled):
+        if self.max_rate <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._bucket(host, time.monotonic())
+            if throttled:
+                bucket['rate'] = max(self.min_rate, bucket['rate'] / 2)
+            else:
+                bucket['rate'] = min(self.max_rate, bucket['rate'] + self.max_rate / 10)
+
+    def stats(self):
+        with self.lock:
+            return {host: round(bucket['rate'], 2) for host, bucket in self.buckets.items()}
+
+host_rate_limiter = HostRateLimiter(Config.LOGIN_HOST_RATE, Config.UPSTREAM_MIN_RATE, Config.UPSTREAM_BURST)
+
+class UpstreamUnavailable(Exception):
+    pass
+
+# 上游熔断器：按主机统计最近请求的失败率（请求异常、429、5xx），
+# 失败率过高时熔断，冷却期内的请求直接失败；冷却后放行一个探测请求，成功则恢复
+class CircuitBreaker:
+    def __init__(self, window, min_calls, failure_rate, cooldown):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.hosts = {}
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                'state': 'closed', 'results': deque(maxlen=self.window), 'opened_at': None, 'probing': False, 'trips': 0
+            }
+        return host, state
+
+    def before(self, url):
+        """请求前检查，熔断中时抛出 UpstreamUnavailable"""
+        with self.lock:
+            host, state = self._host(url)
+            if state['state'] == 'open':
+                remaining = self.cooldown - (time.monotonic() - state['opened_at'])
+                if remaining > 0:
+                    raise UpstreamUnavailable(f"{host} 熔断中，{remaining:.0f} 秒后重试")
+                state['state'] = 'half_open'
+            if state['state'] == 'half_open':
+                if state['probing']:
+                    raise UpstreamUnavailable(f"{host} 熔断恢复探测中")
+                state['probing'] = True
+
+    def record(self, url, failed):
+        with self.lock:
+            host, state = self._host(url)
+            if state['state'] == 'half_open':
+                state['probing'] = False
+                if failed:
+                    self._open(host, state)
+                else:
+                    state['state'] = 'closed'
+                    state['results'].clear()
+                    logger.info(f"上游 {host} 已恢复，关闭熔断")
+                return
+            
+            state['results'].append(failed)
+            calls = len(state['results'])
+            if state['state'] == 'closed' and calls >= self.min_calls and \
+                    sum(state['results']) / calls >= self.failure_rate:
+                self._open(host, state)
+
+    def _open(self, host, state):
+        state['state'] = 'open'
+        state['opened_at'] = time.monotonic()
+        state['trips'] += 1
+        logger.error(f"上游 {host} 失败率过高，熔断 {self.cooldown} 秒")
+
+    def is_open(self, url):
+        with self.lock:
+            _, state = self._host(url)
+            return state['state'] == 'open' and time.monotonic() - state['opened_at'] < self.cooldown
+
+    def stats(self):
+        with self.lock:
+            return {
+                host: {
+                    'state': state['state'],
+                    'calls': len(state['results']),
+                    'failure_rate': round(sum(state['results']) / len(state['results']), 2) if state['results'] else 0,
+                    'trips': state['trips']
+                }
+                for host, state in self.hosts.items()
+            }
+
+# 上游请求延迟统计：按接口和结果分组，累计直方图用于 /api/metrics 导出，
+# 最近的样本用于计算 p50/p95/p99
+class UpstreamMetrics:
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self, sample_size=1000):
+        self.sample_size = sample_size
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, endpoint, outcome, seconds):
+        with self.lock:
+            series = self.series.get((endpoint, outcome))
+            if series is None:
+                series = self.series[(endpoint, outcome)] = {
+                    'buckets': [0] * len(self.BUCKETS),
+                    'count': 0,
+                    'sum': 0.0,
+                    'samples': deque(maxlen=self.sample_size)
+                }
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    series['buckets'][i] += 1
+            series['count'] += 1
+            series['sum'] += seconds
+            series['samples'].append(seconds)
+
+    @staticmethod
+    def _quantile(samples, q):
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                key: dict(series, buckets=list(series['buckets']), samples=sorted(series['samples']))
+                for key, series in self.series.items()
+            }
+
+    def stats(self):
+        result = {}
+        for (endpoint, outcome), series in self.snapshot().items():
+            samples = series['samples']
+            result.setdefault(endpoint, {})[outcome] = {
+                'count': series['count'],
+                'p50': round(self._quantile(samples, 0.5), 4),
+                'p95': round(self._quantile(samples, 0.95), 4),
+                'p99': round(self._quantile(samples, 0.99), 4)
+            }
+        return result
+
+    def prometheus(self):
+        """按Prometheus文本格式导出直方图和分位数"""
+        snapshot = sorted(self.snapshot().items())
+        lines = [
+            '# HELP upstream_request_duration_seconds 上游接口请求耗时',
+            '# TYPE upstream_request_duration_seconds histogram'
+        ]
+        for (endpoint, outcome), series in snapshot:
+            labels = f'endpoint="{endpoint}",outcome="{outcome}"'
+            for bound, count in zip(self.BUCKETS, series['buckets']):
+                lines.append(f'upstream_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'upstream_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series["count"]}')
+            lines.append(f'upstream_request_duration_seconds_sum{{{labels}}} {series["sum"]:.6f}')
+            lines.append(f'upstream_request_duration_seconds_count{{{labels}}} {series["count"]}')
+        lines += [
+            f'# HELP upstream_request_latency_seconds 最近 {self.sample_size} 次上游请求耗时的分位数',
+            '# TYPE upstream_request_latency_seconds summary'
+        ]
+        for (endpoint, outcome), series in snapshot:
+            labels = f'endpoint="{endpoint}",outcome="{outcome}"'
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'upstream_request_latency_seconds{{{labels},quantile="{q}"}} '
+                             f'{self._quantile(series["samples"], q):.6f}')
+            lines.append(f'upstream_request_latency_seconds_sum{{{labels}}} {series["sum"]:.6f}')
+            lines.append(f'upstream_request_latency_seconds_count{{{labels}}} {series["count"]}')
+        return lines
+
+upstream_metrics = UpstreamMetrics()
+
+upstream_breaker = CircuitBreaker(
+    Config.BREAKER_WINDOW,
+    Config.BREAKER_MIN_CALLS,
+    Config.BREAKER_FAILURE_RATE,
+    Config.BREAKER_COOLDOWN
+)
+
+# HTTP会话管理器：每个登录流程使用独立的Session（独立Cookie），
+# 所有Session共享同一个HTTPAdapter连接池，复用到上游的长连接
+class SessionManager:
+    def __init__(self, pool_connections, pool_maxsize):
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.sessions_created = 0
+        self.lock = threading.Lock()
+
+    def new_session(self):
+        # 注意：不要调用这些Session的close()，否则会关闭共享的连接池
+        session = requests.Session()
+        session.mount('https://', self.adapter)
+        session.mount('http://', self.adapter)
+        with self.lock:
+            self.sessions_created += 1
+        return session
+
+    def stats(self):
+        hosts = {}
+        total_requests = 0
+        total_connections = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            # num_connections 为新建连接数（未命中），其余请求复用了已有连接（命中）
+            hits = max(0, pool.num_requests - pool.num_connections)
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'requests': pool.num_requests,
+                'hits': hits,
+                'misses': pool.num_connections
+            }
+            total_requests += pool.num_requests
+            total_connections += pool.num_connections
+        return {
+            'sessions_created': self.sessions_created,
+            'requests': total_requests,
+            'hits': max(0, total_requests - total_connections),
+            'misses': total_connections,
+            'hosts': hosts
+        }
+
+session_manager = SessionManager(Config.HTTP_POOL_CONNECTIONS, Config.HTTP_POOL_MAXSIZE)
+
+# 账号会话缓存：保存登录成功后的token和Cookie，下次运行先用 get_club_list 校验，
+# 仍然有效时跳过验证码和RSA加密的完整登录流程。可选保存到JSON文件，重启后继续使用。
+# 账号或密码修改后指纹变化，旧会话不再使用
+class AccountSessionCache:
+    def __init__(self, ttl, path=None):
+        self.ttl = ttl
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = {int(key): value for key, value in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取会话缓存文件失败: {str(e)}")
+
+    @staticmethod
+    def fingerprint(account_info):
+        return hashlib.sha256(f"{account_info['account']}:{account_info['password']}".encode()).hexdigest()[:16]
+
+    def get(self, account_info):
+        with self.lock:
+            entry = self.entries.get(account_info['id'])
+            if entry is None or entry['fingerprint'] != self.fingerprint(account_info):
+                self.misses += 1
+                return None
+            if entry['expires_at'] <= time.time():
+                del self.entries[account_info['id']]
+                self.invalidated += 1
+                self._save()
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, account_info, token, cookies):
+        with self.lock:
+            self.entries[account_info['id']] = {
+                'fingerprint': self.fingerprint(account_info),
+                'token': token,
+                'cookies': cookies,
+                'expires_at': time.time() + self.ttl
+            }
+            self._save()
+
+    def discard(self, account_id):
+        with self.lock:
+            if self.entries.pop(account_id, None) is not None:
+                self.invalidated += 1
+                self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        # 先写临时文件再替换，避免写入中断导致文件损坏
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"保存会话缓存文件失败: {str(e)}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidated': self.invalidated
+            }
+
+account_session_cache = AccountSessionCache(Config.SESSION_CACHE_TTL, Config.SESSION_CACHE_FILE)
+
+# 俱乐部信息快照：按内容哈希去重，内容与该账号最新一条快照相同时不写数据库。
+# 多个进程可能写入同一账号的快照，因此每次都从数据库读取最新快照的哈希（走 account_id 索引，开销很小）
+class ClubSnapshotStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.written = 0
+        self.unchanged = 0
+
+    def record(self, account_id, club_info):
+        """保存俱乐部信息，返回是否写入了新快照；需要在应用上下文中调用"""
+        data = json.dumps(club_info, ensure_ascii=False, sort_keys=True)
+        content_hash = hashlib.sha256(data.encode('utf-8')).hexdigest()
+        
+        latest = db.session.query(ClubSnapshot.content_hash).filter_by(account_id=account_id) \
+            .order_by(ClubSnapshot.id.desc()).first()
+        latest_hash = latest[0] if latest else None
+        
+        if latest_hash == content_hash:
+            with self.lock:
+                self.unchanged += 1
+            return False
+        
+        db.session.add(ClubSnapshot(account_id=account_id, content_hash=content_hash, data=data))
+        db.session.commit()
+        response_cache.invalidate('club_snapshots')
+        with self.lock:
+            self.written += 1
+        return True
+
+    def stats(self):
+        with self.lock:
+            return {'written': self.written, 'unchanged': self.unchanged}
+
+club_snapshot_store = ClubSnapshotStore()
+
+# 登录日志保留：超过保留天数的日志分批处理，每批先写入待提交的归档段文件（.pending），
+# 再把计数汇总到 login_log_daily，并在同一事务中删除原始行；事务提交后归档段才追加到按日期分文件的
+# gzip JSONL归档，提交失败时丢弃归档段，避免日志既留在表中又被归档；批次之间短暂停顿，避免长时间占用写锁
+class LogRetention:
+    def __init__(self, retention_days, archive_dir, batch_size, pause):
+        self.retention_days = retention_days
+        self.archive_dir = archive_dir
+        self.batch_size = batch_size
+        self.pause = pause
+        self.lock = threading.Lock()
+        self.last_run = None
+
+    def run(self, cutoff=None):
+        """处理 cutoff（默认为保留期起点）之前的日志，返回处理的行数；需要在应用上下文中调用"""
+        if cutoff is None:
+            if self.retention_days <= 0:
+                return 0
+            cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        if not self.lock.acquire(blocking=False):
+            logger.warning("日志保留任务已在执行中，跳过")
+            return 0
+        
+        started = time.perf_counter()
+        total = 0
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            self._recover_segments()
+            while True:
+                rows = LoginLog.query.filter(LoginLog.created_at < cutoff) \
+                    .order_by(LoginLog.created_at, LoginLog.id).limit(self.batch_size).all()
+                if not rows:
+                    break
+                segments = self._archive(rows)
+                try:
+                    self._rollup(rows)
+                    LoginLog.query.filter(LoginLog.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+                    db.session.commit()
+                except Exception:
+                    for segment in segments:
+                        os.remove(segment)
+                    raise
+                for segment in segments:
+                    self._append_segment(segment)
+                response_cache.invalidate('login_logs')
+                total += len(rows)
+                time.sleep(self.pause)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            self.last_run = {
+                'time': datetime.now().isoformat(),
+                'cutoff': cutoff.isoformat(),
+                'rows': total,
+                'seconds': round(time.perf_counter() - started, 2)
+            }
+            self.lock.release()
+        
+        if total:
+            logger.info(f"日志保留任务完成：归档并汇总 {total} 条 {cutoff.date()} 之前的日志")
+        return total
+
+    def _archive(self, rows):
+        """把一批日志按日期写入待提交的归档段文件，返回归档段路径列表"""
+        by_day = {}
+        for row in rows:
+            by_day.setdefault(row.created_at.date(), []).append(row)
+        segments = []
+        for day, day_rows in by_day.items():
+            path = os.path.join(self.archive_dir, f"login_logs_{day.isoformat()}.jsonl.gz")
+            segment = f"{path}.{day_rows[0].id}.pending"
+            segments.append(segment)
+            with gzip.open(segment, 'wt', encoding='utf-8') as f:
+                for row in day_rows:
+                    f.write(json.dumps({
+                        'id': row.id,
+                        'account_id': row.account_id,
+                        'status': row.status,
+                        'message': row.message,
+                        'details': row.details,
+                        'created_at': row.created_at.isoformat()
+                    }, ensure_ascii=False) + "\n")
+        return segments
+
+    def _append_segment(self, segment):
+        # gzip文件可以由多个压缩段拼接，归档段直接追加到归档文件末尾
+        with open(segment, 'rb') as f_in, open(segment.rsplit('.', 2)[0], 'ab') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(segment)
+
+    def _recover_segments(self):
+        # 上次运行在提交前后中断时留下的归档段：日志仍在表中说明删除未提交，丢弃归档段；否则补上追加
+        for name in sorted(os.listdir(self.archive_dir)):
+            if not name.endswith('.pending'):
+                continue
+            segment = os.path.join(self.archive_dir, name)
+            try:
+                with gzip.open(segment, 'rt', encoding='utf-8') as f:
+                    ids = [json.loads(line)['id'] for line in f if line.strip()]
+            except (OSError, EOFError, ValueError):
+                # 归档段不完整，说明写入时中断，删除还没有执行
+                os.remove(segment)
+                continue
+            if ids and LoginLog.query.filter(LoginLog.id.in_(ids)).first() is not None:
+                os.remove(segment)
+            else:
+                self._append_segment(segment)
+
+    def _rollup(self, rows):
+        groups = {}
+        for row in rows:
+            group = groups.setdefault((row.account_id, row.created_at.date()), {
+                'attempts': 0, 'successes': 0, 'first_at': row.created_at, 'last_at': row.created_at
+            })
+            group['attempts'] += 1
+            group['successes'] += row.status == 'success'
+            group['first_at'] = min(group['first_at'], row.created_at)
+            group['last_at'] = max(group['last_at'], row.created_at)
+        
+        existing = {
+            (daily.account_id, daily.day): daily
+            for daily in LoginLogDaily.query.filter(
+                LoginLogDaily.account_id.in_({key[0] for key in groups}),
+                LoginLogDaily.day.in_({key[1] for key in groups})
+            ).all()
+        }
+        for (account_id, day), group in groups.items():
+            daily = existing.get((account_id, day))
+            if daily is None:
+                daily = LoginLogDaily(account_id=account_id, day=day, attempts=0, successes=0, failures=0,
+                                      first_at=group['first_at'], last_at=group['last_at'])
+                db.session.add(daily)
+            daily.attempts += group['attempts']
+            daily.successes += group['successes']
+            daily.failures += group['attempts'] - group['successes']
+            daily.first_at = min(daily.first_at, group['first_at']) if daily.first_at else group['first_at']
+            daily.last_at = max(daily.last_at, group['last_at']) if daily.last_at else group['last_at']
+
+    def stats(self):
+        return {
+            'retention_days': self.retention_days,
+            'running': self.lock.locked(),
+            'last_run': self.last_run
+        }
+
+log_retention = LogRetention(
+    Config.LOG_RETENTION_DAYS,
+    Config.LOG_ARCHIVE_DIR,
+    Config.LOG_RETENTION_BATCH,
+    Config.LOG_RETENTION_PAUSE
+)
+
+def delete_logs_in_batches(*criteria):
+    """按条件分批删除登录日志，每批单独提交，返回删除的行数"""
+    total = 0
+    while True:
+        ids = [row[0] for row in db.session.query(LoginLog.id).filter(*criteria)
+               .order_by(LoginLog.id).limit(Config.LOG_RETENTION_BATCH).all()]
+        if not ids:
+            return total
+        LoginLog.query.filter(LoginLog.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(ids)
+
+# 日志邮件摘要：正文为按账号汇总的当日登录结果，原始日志文件分块读取并gzip压缩为附件，
+# 压缩后超过上限时截断，内存占用和邮件大小都有上界
+def compress_log_file(log_file, max_bytes, chunk_size=64 * 1024):
+    """分块压缩日志文件（已轮转的 .gz 文件先解压），返回 (压缩数据, 已读取的原始字节数, 是否截断)"""
+    buffer = io.BytesIO()
+    read_bytes = 0
+    truncated = False
+    compressed = log_file.endswith('.gz')
+    name = os.path.basename(log_file)[:-3] if compressed else os.path.basename(log_file)
+    with (gzip.open if compressed else open)(log_file, 'rb') as f, \
+            gzip.GzipFile(filename=name, mode='wb', fileobj=buffer) as gz:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            if buffer.tell() >= max_bytes:
+                truncated = True
+                break
+            gz.write(chunk)
+            gz.flush()  # 把压缩器缓冲的数据写出，使 buffer.tell() 反映真实的压缩大小
+            read_bytes += len(chunk)
+        if truncated:
+            gz.write(f"\n...[日志已截断，仅包含前 {read_bytes} 字节]\n".encode('utf-8'))
+    return buffer.getvalue(), read_bytes, truncated
+
+def find_log_file(day):
+    """返回指定日期的日志文件：尚未压缩的 login_<日期>.log，或已压缩的 login_<日期>.log.gz"""
+    candidates = [log_file_path(day), f"{log_file_path(day)}.gz"]
+    for path in candidates:
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            return path
+    return None
+
+# 旧日志文件的压缩和清理只在定时任务领导者的日志保留任务中执行，多个进程不会同时处理同一个文件
+def compress_log_files(backup_days=None, today=None):
+    """压缩今天之前的 login_<日期>.log，删除超过 LOG_BACKUP_DAYS 天的日志文件，返回处理的文件数"""
+    backup_days = Config.LOG_BACKUP_DAYS if backup_days is None else backup_days
+    today = today or datetime.now().date()
+    oldest = today - timedelta(days=backup_days)
+    handled = 0
+    for name in sorted(os.listdir(Config.LOG_DIR)):
+        match = re.fullmatch(r'login_(\d{4}-\d{2}-\d{2})\.log(\.gz)?', name)
+        if not match:
+            continue
+        day = datetime.strptime(match.group(1), '%Y-%m-%d').date()
+        if day >= today:
+            continue
+        path = os.path.join(Config.LOG_DIR, name)
+        try:
+            if day < oldest:
+                os.remove(path)
+                logger.info(f"已删除过期日志文件: {name}")
+            elif not match.group(2):
+                # 先写临时文件再改名，中途失败不会留下不完整的压缩文件
+                with open(path, 'rb') as f_in, gzip.open(f"{path}.gz.tmp", 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                os.replace(f"{path}.gz.tmp", f"{path}.gz")
+                os.remove(path)
+            else:
+                continue
+            handled += 1
+        except OSError as e:
+            logger.error(f"处理日志文件 {name} 失败: {str(e)}")
+    return handled
+
+def build_log_digest(day):
+    """生成指定日期的日志摘要，返回 (正文, 附件文件名, 附件数据)；没有任何日志时返回None"""
+    start_date = datetime.strptime(day, '%Y-%m-%d')
+    end_date = start_date + timedelta(days=1)
+    in_day = (LoginLog.created_at >= start_date, LoginLog.created_at < end_date)
+    
+    # 一次聚合查询得到每个账号的尝试/成功次数和最后一条日志ID
+    rows = db.session.query(
+        LoginLog.account_id,
+        func.count(LoginLog.id),
+        func.sum(case((LoginLog.status == 'success', 1), else_=0)),
+        func.max(LoginLog.id)
+    ).filter(*in_day).group_by(LoginLog.account_id).all()
+    last_logs = {
+        log.id: log for log in LoginLog.query.options(defer(LoginLog.details))
+        .filter(LoginLog.id.in_([row[3] for row in rows])).all()
+    } if rows else {}
+    names = dict(db.session.query(Account.id, Account.name).all())
+    
+    log_file = find_log_file(day)
+    has_file = log_file is not None
+    if not rows and not has_file:
+        return None
+    
+    total = sum(row[1] for row in rows)
+    success = sum(row[2] or 0 for row in rows)
+    lines = [
+        f"自动登录日志摘要 - {day}",
+        f"账号数: {len(rows)}，登录尝试: {total}，成功: {success}，失败: {total - success}",
+        ""
+    ]
+    for account_id, attempts, succeeded, last_id in sorted(rows, key=lambda row: names.get(row[0], '')):
+        last_log = last_logs.get(last_id)
+        lines.append(
+            f"[{names.get(account_id, f'账号{account_id}')}] 尝试 {attempts} 次，成功 {succeeded or 0} 次；"
+            f"最后结果: {last_log.status} {last_log.created_at.strftime('%H:%M:%S')} {last_log.message}"
+        )
+    logged = {row[0] for row in rows}
+    idle = [name for account_id, name in names.items() if account_id not in logged]
+    if idle:
+        lines.append(f"当日无登录记录的账号: {', '.join(sorted(idle))}")
+    
+    attachment = None
+    filename = f"login_{day}.log.gz"
+    if has_file:
+        attachment, read_bytes, truncated = compress_log_file(log_file, Config.LOG_EMAIL_ATTACHMENT_MAX)
+        lines.append("")
+        lines.append(
+            f"原始日志见附件 {filename}（{read_bytes} 字节，压缩后 {len(attachment)} 字节"
+            f"{'，超过大小上限已截断' if truncated else ''}）"
+        )
+    return "\n".join(lines), filename, attachment
+
+# 邮件发件箱：邮件入队后由后台线程发送，不阻塞登录任务。
+# 同一SMTP服务器和发件账号的多个收件人共用一个已认证连接，连接在空闲超时前保持复用；
+# 发送失败的收件人按指数退避重试
+class EmailOutbox:
+    def __init__(self, timeout, max_retries, retry_backoff, idle_timeout, plain_smtp=False):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+        self.plain_smtp = plain_smtp
+        self.condition = threading.Condition()
+        self.pending = []  # (发送时间, 序号, 邮件) 组成的最小堆
+        self.counter = 0
+        self.sending = 0
+        self.connections = {}  # 只由发送线程访问
+        self.thread = None
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def start(self):
+        with self.condition:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._worker, name='email-outbox', daemon=True)
+                self.thread.start()
+
+    def enqueue(self, subject, body, filename=None, attachment=None, configs=None):
+        """把邮件发给指定的（默认为所有启用的）邮件配置，返回邮件ID；没有可用的配置时返回None"""
+        if configs is None:
+            configs = EmailConfig.query.filter_by(is_active=True).all()
+        # 保存配置快照，发送线程不需要访问数据库
+        recipients = [
+            {
+                'smtp_server': config.smtp_server,
+                'smtp_port': config.smtp_port,
+                'sender_email': config.sender_email,
+                'sender_password': config.sender_password,
+                'receiver_email': config.receiver_email
+            }
+            for config in configs
+        ]
+        if not recipients:
+            return None
+        
+        mail = {
+            'id': uuid.uuid4().hex,
+            'subject': subject,
+            'body': body,
+            'filename': filename,
+            'attachment': attachment,
+            'recipients': recipients,
+            'attempts': 0
+        }
+        self.start()
+        self._schedule(mail, time.monotonic())
+        return mail['id']
+
+    def _schedule(self, mail, due):
+        with self.condition:
+            self.counter += 1
+            heapq.heappush(self.pending, (due, self.counter, mail))
+            self.condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """等待队列中的邮件全部处理完（包括等待重试的），返回是否已处理完"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.sending, timeout)
+
+    def _next(self):
+        """取出下一封到期的邮件；空闲超时返回None"""
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.pending and self.pending[0][0] <= now:
+                    self.sending += 1
+                    return heapq.heappop(self.pending)[2]
+                wait = self.pending[0][0] - now if self.pending else None
+                if self.connections:
+                    wait = self.idle_timeout if wait is None else min(wait, self.idle_timeout)
+                if not self.condition.wait(wait):
+                    return None
+
+    def _worker(self):
+        while True:
+            mail = self._next()
+            if mail is None:
+                self.close(idle_only=True)
+                continue
+            try:
+                self._deliver(mail)
+            except Exception as e:
+                logger.error(f"发送邮件时发生错误: {str(e)}")
+            finally:
+                with self.condition:
+                    self.sending -= 1
+                    self.condition.notify_all()
+
+    def _deliver(self, mail):
+        groups = {}
+        for recipient in mail['recipients']:
+            key = (recipient['smtp_server'], recipient['smtp_port'], recipient['sender_email'], recipient['sender_password'])
+            groups.setdefault(key, []).append(recipient)
+        
+        failed = []
+        for key, recipients in groups.items():
+            remaining = list(recipients)
+            try:
+                server = self._connection(key)
+                while remaining:
+                    recipient = remaining[0]
+                    try:
+                        server.sendmail(
+                            recipient['sender_email'],
+                            [recipient['receiver_email']],
+                            self._build(mail, recipient).as_string()
+                        )
+                        logger.info(f"日志邮件已成功发送到 {recipient['receiver_email']}")
+                        with self.condition:
+                            self.sent += 1
+                    except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                        # 收件人被拒绝不影响连接，继续发送给其他收件人
+                        logger.warning(f"发送邮件到 {recipient['receiver_email']} 失败: {str(e)}")
+                        failed.append(recipient)
+                    remaining.pop(0)
+            except (smtplib.SMTPException, OSError) as e:
+                logger.warning(f"SMTP服务器 {key[0]}:{key[1]} 发送失败: {str(e)}")
+                self._drop(key)
+                failed.extend(remaining)
+        
+        mail['attempts'] += 1
+        if not failed:
+            return
+        if mail['attempts'] <= self.max_retries:
+            delay = self.retry_backoff * 2 ** (mail['attempts'] - 1)
+            logger.info(f"{len(failed)} 个收件人发送失败，{delay:.0f} 秒后第 {mail['attempts']} 次重试")
+            with self.condition:
+                self.retried += 1
+            self._schedule(dict(mail, recipients=failed), time.monotonic() + delay)
+        else:
+            logger.error(f"邮件 {mail['subject']} 重试 {self.max_retries} 次后仍有 {len(failed)} 个收件人发送失败，已放弃")
+            with self.condition:
+                self.failed += len(failed)
+
+    @staticmethod
+    def _build(mail, recipient):
+        message = MIMEMultipart()
+        message.attach(MIMEText(mail['body'], 'plain', 'utf-8'))
+        if mail['attachment'] is not None:
+            part = MIMEApplication(mail['attachment'], 'gzip', Name=mail['filename'])
+            part.add_header('Content-Disposition', 'attachment', filename=mail['filename'])
+            message.attach(part)
+        message['From'] = Header(recipient['sender_email'])
+        message['To'] = Header(recipient['receiver_email'])
+        message['Subject'] = Header(mail['subject'], 'utf-8')
+        return message
+
+    def _connection(self, key):
+        entry = self.connections.get(key)
+        if entry is not None:
+            try:
+                if entry['server'].noop()[0] == 250:
+                    entry['last_used'] = time.monotonic()
+                    return entry['server']
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop(key)
+        
+        smtp_server, smtp_port, sender_email, sender_password = key
+        if not self.plain_smtp:
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=self.timeout)
+        else:
+            # 仅用于本地测试（如aiosmtpd）：明文连接，服务器支持时才使用STARTTLS和登录
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=self.timeout)
+            server.ehlo()
+            if server.has_extn('starttls'):
+                server.starttls()
+                server.ehlo()
+        try:
+            if not self.plain_smtp or server.has_extn('auth'):
+                server.login(sender_email, sender_password)
+        except Exception:
+            server.close()
+            raise
+        self.connections[key] = {'server': server, 'last_used': time.monotonic()}
+        return server
+
+    def _drop(self, key):
+        entry = self.connections.pop(key, None)
+        if entry is not None:
+            try:
+                entry['server'].quit()
+            except (smtplib.SMTPException, OSError):
+                entry['server'].close()
+
+    def close(self, idle_only=False):
+        now = time.monotonic()
+        for key, entry in list(self.connections.items()):
+            if not idle_only or now - entry['last_used'] >= self.idle_timeout:
+                self._drop(key)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'queued': len(self.pending),
+                'sending': self.sending,
+                'sent': self.sent,
+                'failed': self.failed,
+                'retried': self.retried,
+                'connections': len(self.connections)
+            }
+
+email_outbox = EmailOutbox(Config.EMAIL_TIMEOUT, Config.EMAIL_MAX_RETRIES, Config.EMAIL_RETRY_BACKOFF, Config.EMAIL_IDLE_TIMEOUT,
+                           Config.EMAIL_PLAIN_SMTP)
+
 # 自动登录类
 class AutoLogin:
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, rate_limiter=None):
+        self.session = session_manager.new_session()
+        self.rate_limiter = rate_limiter or host_rate_limiter
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
             "Accept": "application/json, text/javascript, */*; q=0.01",
@@ -76,66 +1724,117 @@ class AutoLogin:
             "Referer": "https://cms.ayybyyy.com/"
         }
         self.max_attempts = 5
+        self.round_trips = 0
+
+    def _post(self, url, **kwargs):
+        # 所有上游请求都带连接和读取超时，避免卡住的连接一直占用登录线程
+        kwargs.setdefault('timeout', (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT))
+        endpoint = url[len(CMS_API_URL):].lstrip('/') if url.startswith(CMS_API_URL) else urlparse(url).path
+        
+        # 限速等待期间可能已经熔断，等待后再检查
+        self.rate_limiter.acquire(url)
+        upstream_breaker.before(url)
+        self.round_trips += 1
+        started = time.perf_counter()
+        try:
+            response = self.session.post(url, **kwargs)
+        except Exception as e:
+            outcome = 'timeout' if isinstance(e, requests.Timeout) else 'error'
+            upstream_metrics.observe(endpoint, outcome, time.perf_counter() - started)
+            upstream_breaker.record(url, failed=True)
+            self.rate_limiter.record(url, throttled=True)
+            raise
+        
+        if response.status_code == 429:
+            outcome = 'throttled'
+        elif response.status_code >= 500:
+            outcome = 'server_error'
+        elif response.status_code >= 400:
+            outcome = 'client_error'
+        else:
+            outcome = 'ok'
+        upstream_metrics.observe(endpoint, outcome, time.perf_counter() - started)
+        failed = outcome in ('throttled', 'server_error')
+        upstream_breaker.record(url, failed)
+        self.rate_limiter.record(url, failed)
+        return response
+
+    def _sleep(self, seconds, deadline=None):
+        # 等待时间不超过本次运行的截止时间
+        if deadline is not None:
+            seconds = min(seconds, max(0, deadline - time.monotonic()))
+        if seconds > 0:
+            time.sleep(seconds)
 
     def get_token(self):
-        url = "https://cmsapi3.qiucheng-wangluo.com/cms-api/token/generateCaptchaToken"
+        url = f"{CMS_API_URL}/token/generateCaptchaToken"
         try:
-            response = self.session.post(url, headers=self.headers)
+            response = self._post(url, headers=self.headers)
             if response.status_code == 200:
                 result = response.json()
                 if result.get("iErrCode") == 0:
                     return result.get("result")
             logger.error(f"获取token失败: {response.text}")
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"获取token时发生异常: {str(e)}")
         return None
 
     def get_captcha(self, token):
-        url = "https://cmsapi3.qiucheng-wangluo.com/cms-api/captcha"
+        url = f"{CMS_API_URL}/captcha"
         data = {"token": token}
         try:
-            response = self.session.post(url, headers=self.headers, data=data)
+            response = self._post(url, headers=self.headers, data=data)
             if response.status_code == 200:
                 result = response.json()
                 if result.get("iErrCode") == 0:
                     return result.get("result")
             logger.error(f"获取验证码失败: {response.text}")
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"获取验证码时发生异常: {str(e)}")
         return None
 
-    def recognize_captcha(self, captcha_base64):
+    def recognize_captcha(self, captcha_base64, with_confidence=False):
         try:
             captcha_img = base64.b64decode(captcha_base64)
-            captcha_text = ocr.classification(captcha_img)
-            captcha_text = re.sub(r'[^a-zA-Z0-9]', '', captcha_text)
-            if len(captcha_text) > 4:
-                captcha_text = captcha_text[:4]
-            return captcha_text.upper()
+            captcha_text, confidence = captcha_recognizer.recognize(captcha_img)
+            return (captcha_text, confidence) if with_confidence else captcha_text
         except Exception as e:
             logger.error(f"识别验证码时发生异常: {str(e)}")
-            return None
+            return (None, 0.0) if with_confidence else None
+
+    def solve_captcha(self, token):
+        # 识别置信度低时用同一个token刷新验证码，避免为低质量的识别结果付出RSA加密和登录请求的开销；
+        # 刷新次数用完时使用置信度最高的结果
+        best_text, best_confidence = None, 0.0
+        refreshes = 0
+        while True:
+            captcha_base64 = self.get_captcha(token)
+            if not captcha_base64:
+                return best_text, best_confidence, refreshes
+            
+            captcha_text, confidence = self.recognize_captcha(captcha_base64, with_confidence=True)
+            if captcha_text and len(captcha_text) == 4:
+                if confidence >= Config.CAPTCHA_MIN_CONFIDENCE:
+                    return captcha_text, confidence, refreshes
+                if best_text is None or confidence > best_confidence:
+                    best_text, best_confidence = captcha_text, confidence
+            
+            if refreshes >= Config.CAPTCHA_MAX_REFRESH:
+                return best_text, best_confidence, refreshes
+            refreshes += 1
+            logger.debug(f"验证码识别置信度过低({confidence:.2f})，刷新验证码")
 
     def load_public_key(self, key_str):
-        try:
-            if "-----BEGIN" in key_str:
-                return serialization.load_pem_public_key(key_str.encode(), backend=default_backend())
-            else:
-                try:
-                    der_data = base64.b64decode(key_str)
-                    return serialization.load_der_public_key(der_data, backend=default_backend())
-                except:
-                    hex_str = re.sub(r'\s+', '', key_str)
-                    if len(hex_str) % 2 != 0:
-                        hex_str = '0' + hex_str
-                    der_data = bytes.fromhex(hex_str)
-                    return serialization.load_der_public_key(der_data, backend=default_backend())
-        except Exception as e:
-            logger.error(f"加载公钥时发生异常: {str(e)}")
-            return None
+        return public_key_cache.get(key_str)
 
     def rsa_encrypt_long(self, text, public_key_str):
         try:
+            from cryptography.hazmat.primitives.asymmetric import padding
+            
             public_key = self.load_public_key(public_key_str)
             if not public_key:
                 return None
@@ -159,19 +1858,23 @@ class AutoLogin:
             return None
 
     def login(self, account, password, captcha, token, account_name="未知账号"):
-        url = "https://cmsapi3.qiucheng-wangluo.com/cms-api/login"
+        url = f"{CMS_API_URL}/login"
         
         first_encrypted_password = self.rsa_encrypt_long(password, FIRST_PUBLIC_KEY)
         if not first_encrypted_password:
             return None
         
-        second_encrypted_password = self.rsa_encrypt_long(first_encrypted_password, token)
-        if not second_encrypted_password:
-            return None
-        
-        encrypted_account = self.rsa_encrypt_long(account, token)
-        if not encrypted_account:
-            return None
+        # token公钥只在本次登录尝试中使用，加密完成后从缓存移除
+        try:
+            second_encrypted_password = self.rsa_encrypt_long(first_encrypted_password, token)
+            if not second_encrypted_password:
+                return None
+            
+            encrypted_account = self.rsa_encrypt_long(account, token)
+            if not encrypted_account:
+                return None
+        finally:
+            public_key_cache.discard(token)
         
         data = {
             "account": encrypted_account,
@@ -182,15 +1885,17 @@ class AutoLogin:
         }
         
         try:
-            response = self.session.post(url, headers=self.headers, data=data)
+            response = self._post(url, headers=self.headers, data=data)
             if response.status_code == 200:
                 return response.json()
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"登录时发生异常: {str(e)}")
         return None
 
     def get_club_list(self, token, account_name="未知账号"):
-        url = "https://cmsapi3.qiucheng-wangluo.com/cms-api/club/getClubList"
+        url = f"{CMS_API_URL}/club/getClubList"
         headers = {
             "accept": "application/json, text/javascript",
             "accept-language": "zh-CN,zh;q=0.9,en;q=0.8",
@@ -202,67 +1907,109 @@ class AutoLogin:
         }
         
         try:
-            response = requests.post(url, headers=headers)
+            response = self._post(url, headers=headers)
             if response.status_code == 200:
                 result = response.json()
                 if result.get("iErrCode") == 0:
                     club_data = result.get("result")
+                    # 俱乐部信息保存为快照，可通过 /api/clubs 查询，日志中只在调试级别输出
                     if isinstance(club_data, list) and len(club_data) > 0:
                         club_info = club_data[0]
-                        logger.info(f"[{account_name}] 俱乐部信息: {club_info}")
+                        logger.debug(f"[{account_name}] 俱乐部信息: {club_info}")
                         return club_info
                     elif isinstance(club_data, dict):
-                        logger.info(f"[{account_name}] 俱乐部信息: {club_data}")
+                        logger.debug(f"[{account_name}] 俱乐部信息: {club_data}")
                         return club_data
+        except UpstreamUnavailable:
+            raise
         except Exception as e:
             logger.error(f"获取俱乐部列表时发生异常: {str(e)}")
         return None
 
-    def login_account(self, account_info):
+    def login_account(self, account_info, deadline=None):
+        # 本次登录流程中的日志都带上账号信息，结束后恢复
+        context = log_context.set({'account': account_info.get('name', '未知账号'),
+                                   'account_id': account_info.get('id')})
+        try:
+            return self._login_account(account_info, deadline)
+        finally:
+            log_context.reset(context)
+
+    def _login_account(self, account_info, deadline=None):
         account_name = account_info.get("name", "未知账号")
         account = account_info["account"]
         password = account_info["password"]
         
         logger.info(f"开始为账号 [{account_name}] 执行自动登录流程...")
         
+        # 校验缓存的会话也要请求上游，超过截止时间后同样不再执行
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning(f"[{account_name}] 已超过本次运行截止时间，停止登录")
+            return False
+        
+        if account_info.get('id') is not None and self.reuse_session(account_info):
+            return True
+        
         for attempt in range(1, self.max_attempts + 1):
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(f"[{account_name}] 已超过本次运行截止时间，停止登录")
+                return False
+            
             logger.info(f"尝试第 {attempt} 次登录 [{account_name}]...")
+            attempt_round_trips = self.round_trips
+            attempt_started = time.perf_counter()
             
+            update_log_context(attempt=attempt, phase='token')
             token = self.get_token()
             if not token:
-                time.sleep(2)
-                continue
-            
-            captcha_base64 = self.get_captcha(token)
-            if not captcha_base64:
-                time.sleep(2)
+                login_stats.record(account_name, attempt, 'no_token', self.round_trips - attempt_round_trips)
+                self._sleep(2, deadline)
                 continue
             
-            captcha_text = self.recognize_captcha(captcha_base64)
-            if not captcha_text or len(captcha_text) != 4:
-                time.sleep(2)
+            update_log_context(phase='captcha')
+            captcha_text, confidence, refreshes = self.solve_captcha(token)
+            if not captcha_text:
+                login_stats.record(account_name, attempt, 'captcha_unusable',
+                                   self.round_trips - attempt_round_trips, refreshes)
+                self._sleep(2, deadline)
                 continue
             
+            update_log_context(phase='login')
             login_result = self.login(account, password, captcha_text, token, account_name)
             
+            if not login_result:
+                outcome = 'error'
+            elif login_result.get("iErrCode") == 0:
+                outcome = 'success'
+            elif "验证码" in login_result.get("sErrMsg", ""):
+                outcome = 'captcha_rejected'
+            else:
+                outcome = 'failed'
+            login_stats.record(account_name, attempt, outcome,
+                               self.round_trips - attempt_round_trips, refreshes, confidence)
+            latency_ms = round((time.perf_counter() - attempt_started) * 1000, 1)
+            
             if login_result:
                 if login_result.get("iErrCode") == 0:
                     logger.info(f"[{account_name}] 登录成功!")
                     
                     # 记录登录成功日志
-                    log_entry = LoginLog(
+                    login_log_writer.add(
                         account_id=account_info.get('id'),
                         status='success',
                         message='登录成功',
-                        details=json.dumps(login_result, ensure_ascii=False)
+                        details=json.dumps(login_result, ensure_ascii=False),
+                        latency_ms=latency_ms
                     )
-                    db.session.add(log_entry)
-                    db.session.commit()
                     
                     # 获取俱乐部列表
+                    update_log_context(phase='club_list')
                     club_info = self.get_club_list(token, account_name)
                     if club_info:
                         logger.info(f"[{account_name}] 获取俱乐部列表成功")
+                        if account_info.get('id') is not None:
+                            account_session_cache.put(account_info, token, self.session.cookies.get_dict())
+                            self.save_club_snapshot(account_info, club_info)
                     
                     return True
                 else:
@@ -270,123 +2017,412 @@ class AutoLogin:
                     logger.error(f"[{account_name}] 登录失败: {error_msg}")
                     
                     # 记录登录失败日志
-                    log_entry = LoginLog(
+                    login_log_writer.add(
                         account_id=account_info.get('id'),
                         status='failed',
                         message=error_msg,
-                        details=json.dumps(login_result, ensure_ascii=False)
+                        details=json.dumps(login_result, ensure_ascii=False),
+                        latency_ms=latency_ms
                     )
-                    db.session.add(log_entry)
-                    db.session.commit()
                     
                     if "验证码" in error_msg:
-                        time.sleep(1)
+                        self._sleep(1, deadline)
                         continue
             
             if attempt < self.max_attempts:
                 wait_time = 2 ** attempt
-                time.sleep(wait_time)
+                self._sleep(wait_time, deadline)
         
         logger.error(f"[{account_name}] 已达到最大尝试次数 {self.max_attempts}，登录失败")
         return False
 
-    def run_all_accounts(self):
-        accounts = Account.query.filter_by(is_active=True).all()
-        success_count = 0
+    def reuse_session(self, account_info):
+        """缓存的会话仍然有效时直接使用，返回是否成功"""
+        account_name = account_info.get("name", "未知账号")
+        entry = account_session_cache.get(account_info)
+        if entry is None:
+            return False
+        
+        round_trips = self.round_trips
+        started = time.perf_counter()
+        update_log_context(phase='session_reuse')
+        self.session.cookies.update(entry['cookies'])
+        club_info = self.get_club_list(entry['token'], account_name)
+        if not club_info:
+            logger.info(f"[{account_name}] 缓存的会话已失效，重新登录")
+            account_session_cache.discard(account_info['id'])
+            self.session.cookies.clear()
+            return False
         
-        for account in accounts:
-            account_info = {
+        logger.info(f"[{account_name}] 缓存的会话仍然有效，跳过登录")
+        self.save_club_snapshot(account_info, club_info)
+        login_stats.record(account_name, 0, 'session_reused', self.round_trips - round_trips)
+        login_log_writer.add(
+            account_id=account_info['id'],
+            status='success',
+            message='会话仍然有效，跳过登录',
+            details=json.dumps(club_info, ensure_ascii=False),
+            latency_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return True
+
+    def save_club_snapshot(self, account_info, club_info):
+        try:
+            if club_snapshot_store.record(account_info['id'], club_info):
+                logger.info(f"[{account_info.get('name')}] 俱乐部信息有变化，已保存快照")
+        except Exception as e:
+            logger.error(f"[{account_info.get('name')}] 保存俱乐部信息快照失败: {str(e)}")
+            db.session.rollback()
+
+    def run_isolated_login(self, account_info, deadline=None):
+        """返回是否登录成功；上游熔断导致未完成时返回None"""
+        # 使用独立的AutoLogin实例（独立会话），共享主机限速器；同一账号已在登录中时跳过
+        if upstream_breaker.is_open(CMS_API_URL):
+            return None
+        if not inflight_accounts.claim(account_info['id']):
+            logger.warning(f"[{account_info.get('name')}] 已有登录流程在执行，跳过")
+            return False
+        try:
+            with app.app_context():
+                try:
+                    return AutoLogin(self.rate_limiter).login_account(account_info, deadline)
+                except UpstreamUnavailable as e:
+                    logger.warning(f"[{account_info.get('name')}] 上游不可用，停止登录: {str(e)}")
+                    return None
+                except Exception as e:
+                    logger.error(f"[{account_info.get('name')}] 登录流程异常: {str(e)}")
+                    db.session.rollback()
+                    return False
+        finally:
+            inflight_accounts.release(account_info['id'])
+
+    def run_all_accounts(self, progress=None, account_ids=None):
+        """返回 (成功数, 总数)"""
+        success_count, total, _ = self.login_accounts(progress, account_ids)
+        return success_count, total
+
+    def login_accounts(self, progress=None, account_ids=None):
+        """并发登录启用的账号，返回 (成功数, 总数, 因上游熔断未完成的账号数)"""
+        with app.app_context():
+            query = Account.query.filter_by(is_active=True)
+            if account_ids is not None:
+                query = query.filter(Account.id.in_(account_ids))
+            accounts = query.all()
+            account_infos = [{
                 'id': account.id,
                 'account': account.account,
                 'password': account.password,
                 'name': account.name
-            }
+            } for account in accounts]
             
-            if self.login_account(account_info):
-                success_count += 1
-            time.sleep(3)
-        
-        logger.info(f"自动登录流程完成，成功: {success_count}/{len(accounts)}")
-        
-        # 发送日志邮件
-        self.send_log_email()
-        
-        return success_count, len(accounts)
+            success_count = 0
+            unavailable_count = 0
+            deadline = time.monotonic() + Config.LOGIN_RUN_DEADLINE
+            workers = max(1, min(Config.LOGIN_CONCURRENCY, len(account_infos)))
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login') as executor:
+                futures = [executor.submit(self.run_isolated_login, info, deadline) for info in account_infos]
+                for done, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    if result:
+                        success_count += 1
+                    elif result is None:
+                        unavailable_count += 1
+                    if progress:
+                        progress(done, len(account_infos))
+            
+            if unavailable_count:
+                # 上游熔断时其余账号直接跳过，整次运行只给出一个结果
+                logger.error(f"上游服务不可用，本次运行提前结束，成功: {success_count}/{len(account_infos)}，"
+                             f"未完成: {unavailable_count}")
+            else:
+                logger.info(f"自动登录流程完成，成功: {success_count}/{len(account_infos)}")
+            login_log_writer.flush()
+            
+            # 发送日志邮件
+            self.send_log_email()
+            
+            return success_count, len(account_infos), unavailable_count
 
     def send_log_email(self):
+        """生成当日日志摘要并放入发件箱，由后台线程发送"""
         try:
-            email_config = EmailConfig.query.filter_by(is_active=True).first()
-            if not email_config:
-                logger.warning("未找到有效的邮件配置")
-                return False
-            
             today = datetime.now().strftime("%Y-%m-%d")
-            log_file = os.path.join(Config.LOG_DIR, f"login_{today}.log")
-            
-            if not os.path.exists(log_file):
-                logger.warning("日志文件不存在，无法发送邮件")
-                return False
-            
-            with open(log_file, 'r', encoding='utf-8') as f:
-                log_content = f.read()
+            digest = build_log_digest(today)
             
-            if not log_content.strip():
+            if digest is None:
                 logger.info("日志内容为空，不发送邮件")
                 return False
             
-            subject = f"自动登录日志 - {today}"
-            message = MIMEText(log_content, 'plain', 'utf-8')
-            message['From'] = Header(email_config.sender_email)
-            message['To'] = Header(email_config.receiver_email)
-            message['Subject'] = Header(subject, 'utf-8')
-            
-            with smtplib.SMTP_SSL(
-                email_config.smtp_server,
-                email_config.smtp_port
-            ) as server:
-                server.login(
-                    email_config.sender_email,
-                    email_config.sender_password
-                )
-                server.sendmail(
-                    email_config.sender_email,
-                    [email_config.receiver_email],
-                    message.as_string()
-                )
+            summary, filename, attachment = digest
+            mail_id = email_outbox.enqueue(f"自动登录日志 - {today}", summary, filename, attachment)
+            if mail_id is None:
+                logger.warning("未找到有效的邮件配置")
+                return False
             
-            logger.info(f"日志邮件已成功发送到 {email_config.receiver_email}")
+            logger.info(f"日志邮件已加入发送队列: {mail_id}")
             return True
         except Exception as e:
-            logger.error(f"发送邮件时发生错误: {str(e)}")
+            logger.error(f"生成日志邮件时发生错误: {str(e)}")
             return False
 
 # 创建自动登录实例
 auto_login = AutoLogin()
 
-# 定时任务调度器
-scheduler = BackgroundScheduler()
-scheduler.start()
+# 定时任务调度器：任务保存在数据库中，多个进程（如gunicorn的多个worker）共用同一份任务。
+# 提供Web服务的进程调用 start_scheduler() 后调度器以暂停状态启动，只有取得领导租约的进程恢复执行，
+# 避免同一任务被执行多次；只导入本模块的进程不启动调度器
+if __name__ == '__main__':
+    # 任务存储按 "app:函数名" 引用任务函数，直接运行时让它指向当前模块，而不是再导入一次
+    sys.modules.setdefault('app', sys.modules[__name__])
+with app.app_context():
+    job_store = SQLAlchemyJobStore(engine=db.engine)
+    scheduler = BackgroundScheduler(jobstores={'default': job_store})
+
+# 定时任务增删改、执行后使状态缓存失效，并把最新状态推送给仪表盘
+def on_scheduler_event(event):
+    response_cache.invalidate('scheduler')
+    event_broker.publish('scheduler', scheduler_status())
+
+scheduler.add_listener(
+    on_scheduler_event,
+    EVENT_ALL_JOBS_REMOVED | EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_JOB_MODIFIED |
+    EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+)
+
+# 后台预热：解析固定公钥并加载一个OCR模型，避免在导入时阻塞Web服务启动；其余模型在并发识别时按需加载
+warmup_lock = threading.Lock()
+warmup_thread = None
+
+def warmup():
+    started = time.perf_counter()
+    public_key_cache.pin(FIRST_PUBLIC_KEY)
+    record_startup('warmup_crypto', started)
+    captcha_recognizer.start()
+
+def start_background_warmup():
+    global warmup_thread
+    with warmup_lock:
+        if warmup_thread is None:
+            warmup_thread = threading.Thread(target=warmup, name='warmup', daemon=True)
+            warmup_thread.start()
+
+@app.before_request
+def trigger_warmup():
+    if Config.WARMUP_ENABLED and warmup_thread is None:
+        start_background_warmup()
 
 # 添加定时任务
+# 定时任务从 ScheduledTask 表加载：任务ID为 task_<id>，表中任务增删改后重新同步。
+# 同一任务最多同时运行一次，错过的多次触发合并为一次
+def build_cron_trigger(cron_expression, jitter_seconds=0):
+    """解析5段crontab表达式（分 时 日 月 周），格式错误时抛出ValueError"""
+    fields = cron_expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"cron表达式需要5个字段: {cron_expression}")
+    minute, hour, day, month, day_of_week = fields
+    return CronTrigger(minute=minute, hour=hour, day=day, month=month, day_of_week=day_of_week,
+                       jitter=jitter_seconds or None)
+
+def run_scheduled_task(task_id, version=None):
+    # version 是任务定义的更新时间，只用于同步时判断任务是否被修改
+    with app.app_context():
+        task = db.session.get(ScheduledTask, task_id)
+        if task is None or not task.is_active:
+            logger.warning(f"定时任务 {task_id} 不存在或已停用，跳过执行")
+            return
+        name, account_ids = task.name, task.account_id_list()
+        job = scheduler.get_job(f"task_{task_id}")
+        update_task_times(task_id, last_run=datetime.utcnow(), next_run=utc_naive(job.next_run_time) if job else None)
+    
+    logger.info(f"开始执行定时任务: {name}")
+    auto_login.run_all_accounts(account_ids=account_ids)
+
+def utc_naive(value):
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value else None
+
+def update_task_times(task_id, **times):
+    # 只更新运行时间，保持 updated_at 不变，避免触发重新同步
+    times['updated_at'] = ScheduledTask.updated_at
+    ScheduledTask.query.filter_by(id=task_id).update(times)
+    db.session.commit()
+
+def sync_scheduled_tasks():
+    """按 ScheduledTask 表增加、更新、移除调度器中的任务"""
+    # 本进程没有启动调度器时（SCHEDULER_ENABLED=false、测试或命令行导入），调度器中的任务不可见，
+    # 只按触发器计算下次运行时间，任务由领导进程定期同步
+    stopped = scheduler.state == STATE_STOPPED
+    with app.app_context():
+        tasks = ScheduledTask.query.filter_by(is_active=True).all()
+        wanted = set()
+        for task in tasks:
+            job_id = f"task_{task.id}"
+            try:
+                trigger = build_cron_trigger(task.cron_expression, task.jitter_seconds)
+            except ValueError as e:
+                logger.error(f"定时任务 {task.name} 的cron表达式无效: {str(e)}")
+                continue
+            wanted.add(job_id)
+            
+            if stopped:
+                next_run = utc_naive(trigger.get_next_fire_time(None, datetime.now(trigger.timezone)))
+                if task.next_run != next_run:
+                    update_task_times(task.id, next_run=next_run)
+                continue
+            
+            version = task.updated_at.isoformat() if task.updated_at else ''
+            job = scheduler.get_job(job_id)
+            if job is None or job.kwargs.get('version') != version:
+                job = scheduler.add_job(
+                    func='app:run_scheduled_task',
+                    trigger=trigger,
+                    kwargs={'task_id': task.id, 'version': version},
+                    id=job_id,
+                    name=task.name,
+                    max_instances=1,
+                    coalesce=True,
+                    misfire_grace_time=Config.SCHEDULER_MISFIRE_GRACE,
+                    replace_existing=True
+                )
+                logger.info(f"已加载定时任务: {task.name} ({task.cron_expression})")
+            
+            next_run = utc_naive(job.next_run_time)
+            if task.next_run != next_run:
+                update_task_times(task.id, next_run=next_run)
+        
+        if stopped:
+            return
+        for job in scheduler.get_jobs():
+            if job.id.startswith('task_') and job.id not in wanted:
+                scheduler.remove_job(job.id)
+                logger.info(f"已移除定时任务: {job.name}")
+
+def run_log_retention():
+    compress_log_files()
+    with app.app_context():
+        log_retention.run()
+
 def add_scheduled_tasks():
-    # 每天早上9:30执行登录
+    sync_scheduled_tasks()
+    # 每天清理超过保留期的登录日志
     scheduler.add_job(
-        func=auto_login.run_all_accounts,
-        trigger=CronTrigger(hour=9, minute=30),
-        id='daily_login_9_30',
-        name='每日登录任务(9:30)',
+        func='app:run_log_retention',
+        trigger=build_cron_trigger(Config.LOG_RETENTION_CRON),
+        id='log_retention',
+        name='登录日志归档清理',
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=Config.SCHEDULER_MISFIRE_GRACE,
         replace_existing=True
     )
-    
-    # 每天中午11:50执行登录
+    # 定期重新同步，使直接修改数据库的变更也能生效
     scheduler.add_job(
-        func=auto_login.run_all_accounts,
-        trigger=CronTrigger(hour=11, minute=50),
-        id='daily_login_11_50',
-        name='每日登录任务(11:50)',
+        func='app:sync_scheduled_tasks',
+        trigger='interval',
+        seconds=Config.SCHEDULER_RELOAD_INTERVAL,
+        id='reload_scheduled_tasks',
+        name='同步定时任务',
+        max_instances=1,
+        coalesce=True,
         replace_existing=True
     )
 
+# 定时任务领导选举：进程通过 scheduler_locks 表中的租约竞争领导权，持有者定期心跳续期。
+# 领导进程同步任务并恢复调度器；租约被其他进程取得（如心跳中断超过租约时间）时暂停调度器
+class SchedulerLeader:
+    def __init__(self, name, lease_seconds):
+        self.name = name
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.table_ready = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='scheduler-leader', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            self.tick()
+            self.stop_event.wait(self.lease_seconds / 3)
+
+    def tick(self):
+        try:
+            with app.app_context():
+                acquired = self._acquire()
+        except Exception as e:
+            logger.error(f"续期定时任务租约失败: {str(e)}")
+            acquired = False
+        
+        if acquired and not self.is_leader:
+            try:
+                add_scheduled_tasks()
+            except Exception as e:
+                logger.error(f"加载定时任务失败: {str(e)}")
+                return
+            scheduler.resume()
+            self.is_leader = True
+            response_cache.invalidate('scheduler')
+            logger.info(f"本进程取得定时任务领导权: {self.owner}")
+        elif not acquired and self.is_leader:
+            scheduler.pause()
+            self.is_leader = False
+            response_cache.invalidate('scheduler')
+            logger.warning(f"本进程失去定时任务领导权，暂停调度: {self.owner}")
+
+    def _acquire(self):
+        if not self.table_ready:
+            # 首次选举可能早于 init_db 建表
+            SchedulerLock.__table__.create(db.engine, checkfirst=True)
+            self.table_ready = True
+        now = datetime.utcnow()
+        values = {'owner': self.owner, 'expires_at': now + timedelta(seconds=self.lease_seconds), 'heartbeat_at': now}
+        # 租约属于本进程或已过期时才能取得，条件更新保证同一时刻只有一个进程成功
+        result = db.session.execute(
+            update(SchedulerLock)
+            .where(SchedulerLock.name == self.name)
+            .where(or_(SchedulerLock.owner == self.owner, SchedulerLock.expires_at < now))
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            if db.session.get(SchedulerLock, self.name) is not None:
+                db.session.rollback()
+                return False
+            db.session.add(SchedulerLock(name=self.name, **values))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return False
+        return True
+
+    def release(self):
+        self.stop_event.set()
+        if not self.is_leader:
+            return
+        scheduler.pause()
+        self.is_leader = False
+        try:
+            with app.app_context():
+                SchedulerLock.query.filter_by(name=self.name, owner=self.owner).delete()
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"释放定时任务租约失败: {str(e)}")
+
+scheduler_leader = SchedulerLeader('scheduler', Config.SCHEDULER_LEASE_SECONDS)
+
+def start_scheduler():
+    """参与定时任务领导选举。只由提供Web服务的进程调用（直接运行本文件或gunicorn的worker），
+    测试、基准脚本和 flask db 等命令导入本模块时调度器保持暂停，不会执行任务存储中的登录任务"""
+    if not Config.SCHEDULER_ENABLED:
+        return
+    if not scheduler.running:
+        scheduler.start(paused=True)
+    scheduler_leader.start()
+
 # 初始化数据库
 def init_db():
     with app.app_context():
@@ -412,9 +2448,98 @@ def init_db():
             )
             db.session.add(default_email)
         
+        # 对已有数据库补齐迁移中的变更（索引、新增列等）
         db.session.commit()
+        upgrade()
+        # 任务存储表平时由调度器启动时创建，未启动调度器的进程也需要它来查询定时任务状态版本
+        job_store.jobs_t.create(db.engine, checkfirst=True)
+        
+        # 检查是否有定时任务，默认每天9:30和11:50执行登录
+        if ScheduledTask.query.count() == 0:
+            db.session.add(ScheduledTask(name='每日登录任务(9:30)', cron_expression='30 9 * * *'))
+            db.session.add(ScheduledTask(name='每日登录任务(11:50)', cron_expression='50 11 * * *'))
+            db.session.commit()
         logger.info("数据库初始化完成")
 
+# 数据表版本：最大ID（主键索引）反映新增，cache_versions 中的计数由写接口递增，反映修改和删除。
+# 两者都只需一次索引查找，与表的大小无关；版本都来自数据库，多个进程计算出的版本和ETag一致
+CACHE_TABLES = {
+    'accounts': Account,
+    'email_configs': EmailConfig,
+    'login_logs': LoginLog,
+    'club_snapshots': ClubSnapshot
+}
+
+def scheduler_version():
+    # 定时任务状态由任务存储表和领导租约决定，任何进程增删改任务或接管领导权都会改变版本
+    jobs = job_store.jobs_t
+    values = list(db.session.query(func.count(jobs.c.id), func.max(jobs.c.next_run_time),
+                                   func.sum(jobs.c.next_run_time)).one())
+    values.append(db.session.query(SchedulerLock.owner).filter_by(name=scheduler_leader.name).scalar())
+    return values
+
+def bump_cache_versions(tables):
+    # 使用独立的连接和事务，不影响调用方会话中未提交的修改；失败时其他进程要等到下一次写入才会刷新缓存
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(update(CacheVersion).where(CacheVersion.name.in_(tables))
+                               .values(version=CacheVersion.version + 1))
+    except Exception as e:
+        logger.error(f"更新缓存版本失败: {str(e)}")
+
+def table_version(table):
+    if table == 'scheduler':
+        values = scheduler_version()
+    else:
+        model = CACHE_TABLES[table]
+        version = select(CacheVersion.version).where(CacheVersion.name == table).scalar_subquery()
+        values = db.session.query(func.max(model.id), version).one()
+    return f"{table}:" + ':'.join(str(value) for value in values)
+
+def cached_json(*tables):
+    """缓存GET接口的JSON响应，并支持ETag条件请求"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.maxsize:
+                return view(*args, **kwargs)
+            key = request.full_path
+            entry = response_cache.get(key)
+            
+            if entry is not None and entry['expires_at'] > time.monotonic():
+                response_cache.count('hits')
+            else:
+                version = '|'.join(table_version(table) for table in tables)
+                if entry is not None and entry['version'] == version:
+                    # 缓存过期但数据版本未变化，直接续期
+                    response_cache.count('revalidated')
+                    response_cache.put(key, entry)
+                else:
+                    response_cache.count('misses')
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    entry = {
+                        'tables': tables,
+                        'version': version,
+                        'etag': hashlib.md5(f"{version}|{key}".encode()).hexdigest(),
+                        'body': body,
+                        'mimetype': response.mimetype,
+                        'headers': {name: value for name, value in response.headers.items() if name.startswith('X-')}
+                    }
+                    response_cache.put(key, entry)
+            
+            if request.if_none_match.contains(entry['etag']):
+                response = Response(status=304)
+            else:
+                response = Response(entry['body'], mimetype=entry['mimetype'], headers=entry['headers'])
+            response.set_etag(entry['etag'])
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
 # 路由定义
 @app.route('/')
 def index():
@@ -423,6 +2548,7 @@ def index():
     return render_template('index.html', accounts=accounts, email_configs=email_configs)
 
 @app.route('/api/accounts', methods=['GET'])
+@cached_json('accounts')
 def get_accounts():
     accounts = Account.query.all()
     return jsonify([account.to_dict() for account in accounts])
@@ -438,6 +2564,7 @@ def add_account():
     )
     db.session.add(account)
     db.session.commit()
+    response_cache.invalidate('accounts')
     return jsonify(account.to_dict())
 
 @app.route('/api/accounts/<int:account_id>', methods=['PUT'])
@@ -449,6 +2576,7 @@ def update_account(account_id):
     account.name = data.get('name', account.name)
     account.is_active = data.get('is_active', account.is_active)
     db.session.commit()
+    response_cache.invalidate('accounts')
     return jsonify(account.to_dict())
 
 @app.route('/api/accounts/<int:account_id>', methods=['DELETE'])
@@ -456,8 +2584,207 @@ def delete_account(account_id):
     account = Account.query.get_or_404(account_id)
     db.session.delete(account)
     db.session.commit()
+    response_cache.invalidate('accounts', 'club_snapshots')
     return jsonify({'message': '账号删除成功'})
 
+# 账号批量导入导出
+ACCOUNT_EXPORT_FIELDS = ('account', 'password', 'name', 'is_active')
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 'on', '是', '启用')
+FALSE_VALUES = ('0', 'false', 'no', 'n', 'off', '否', '禁用')
+
+def parse_is_active(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f'无法识别的启用状态: {value}')
+
+def validate_account_row(row):
+    """校验一行导入数据，返回可写入的字段；未填写名称或启用状态时不修改已有账号的对应字段"""
+    if not isinstance(row, dict):
+        raise ValueError('每行必须是包含账号字段的对象')
+    account = str(row.get('account') or '').strip()
+    password = str(row.get('password') or '')
+    name = str(row.get('name') or '').strip()
+    if not account:
+        raise ValueError('缺少登录账号(account)')
+    if not password:
+        raise ValueError('缺少登录密码(password)')
+    if max(len(account), len(password), len(name)) > 255:
+        raise ValueError('字段长度不能超过255个字符')
+    data = {'account': account, 'password': password}
+    if name:
+        data['name'] = name
+    if row.get('is_active') not in (None, ''):
+        data['is_active'] = parse_is_active(row['is_active'])
+    return data
+
+def iter_import_rows(stream, fmt):
+    """逐行读取上传的数据，产出 (行号, 原始行)；解析失败的行产出 (行号, 异常)"""
+    lines = codecs.iterdecode(iter(stream.readline, b''), 'utf-8-sig')
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, ValueError('列数多于表头')
+                    continue
+                yield reader.line_num, row
+        except csv.Error as e:
+            yield reader.line_num, ValueError(f'CSV格式错误: {e}')
+        return
+    
+    # JSON：每行一个对象(JSON Lines)，或者整个请求体是一个数组
+    first = True
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        if first and line.lstrip().startswith('['):
+            try:
+                items = json.loads(line + ''.join(lines))
+            except ValueError as e:
+                yield number, ValueError(f'JSON格式错误: {e}')
+                return
+            if not isinstance(items, list):
+                yield number, ValueError('JSON数组格式错误')
+                return
+            for index, item in enumerate(items, 1):
+                yield index, item
+            return
+        first = False
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'JSON格式错误: {e}')
+
+def upsert_account_chunk(rows):
+    """在一个事务中按 account 字段插入或更新一批账号，返回 (新增数, 更新数)"""
+    latest = {}
+    for _, data in rows:
+        latest[data['account']] = data  # 同一批中重复的账号以最后一行为准
+    existing = {account.account: account
+                for account in Account.query.filter(Account.account.in_(list(latest)))}
+    
+    created = []
+    for key, data in latest.items():
+        account = existing.get(key)
+        if account is None:
+            created.append(Account(account=key, password=data['password'], name=data.get('name') or key,
+                                   is_active=data.get('is_active', True)))
+            continue
+        for field, value in data.items():
+            setattr(account, field, value)
+    db.session.add_all(created)
+    db.session.commit()
+    return len(created), len(existing)
+
+@app.route('/api/accounts/import', methods=['POST'])
+def import_accounts():
+    # 支持上传文件(file字段)或直接提交请求体；边读边校验，按块提交事务
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    name = (upload.filename if upload else '') or ''
+    mimetype = upload.mimetype if upload else request.mimetype
+    fmt = request.args.get('format') or ('csv' if name.lower().endswith('.csv') or 'csv' in mimetype else 'json')
+    if fmt not in ('csv', 'json'):
+        return jsonify({'message': 'format 只支持 csv 或 json'}), 400
+    
+    chunk_size = max(1, app.config['ACCOUNT_IMPORT_CHUNK'])
+    max_errors = app.config['ACCOUNT_IMPORT_MAX_ERRORS']
+    result = {'total': 0, 'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    
+    def fail(line, error):
+        result['failed'] += 1
+        if len(result['errors']) < max_errors:
+            result['errors'].append({'line': line, 'error': str(error)})
+    
+    def flush(chunk):
+        try:
+            created, updated = upsert_account_chunk(chunk)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"账号导入写入失败: {str(e)}")
+            for line, _ in chunk:
+                fail(line, f'写入失败: {e}')
+            return
+        result['created'] += created
+        result['updated'] += updated
+    
+    chunk = []
+    for line, row in iter_import_rows(stream, fmt):
+        result['total'] += 1
+        if isinstance(row, Exception):
+            fail(line, row)
+            continue
+        try:
+            chunk.append((line, validate_account_row(row)))
+        except ValueError as e:
+            fail(line, e)
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    
+    if result['created'] or result['updated']:
+        response_cache.invalidate('accounts')
+    logger.info(f"账号导入完成: 共 {result['total']} 行，新增 {result['created']}，"
+                f"更新 {result['updated']}，失败 {result['failed']}")
+    return jsonify(result)
+
+@app.route('/api/accounts/export', methods=['GET'])
+def export_accounts():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ('csv', 'json'):
+        return jsonify({'message': 'format 只支持 csv 或 json'}), 400
+    
+    def generate():
+        query = Account.query.order_by(Account.id).yield_per(500)
+        if fmt == 'json':
+            for account in query:
+                yield json.dumps({field: getattr(account, field) for field in ACCOUNT_EXPORT_FIELDS},
+                                 ensure_ascii=False) + '\n'
+            return
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # 带BOM便于Excel识别UTF-8，导入时会自动去除
+        writer.writerow(ACCOUNT_EXPORT_FIELDS)
+        yield '\ufeff' + buffer.getvalue()
+        for account in query:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([account.account, account.password, account.name,
+                             'true' if account.is_active else 'false'])
+            yield buffer.getvalue()
+    
+    filename = f"accounts_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{'csv' if fmt == 'csv' else 'jsonl'}"
+    return Response(stream_with_context(generate()),
+                    mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/accounts/batch', methods=['POST'])
+def batch_update_accounts():
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return jsonify({'message': 'ids 必须是非空的账号ID列表'}), 400
+    if 'is_active' not in data:
+        return jsonify({'message': '缺少 is_active'}), 400
+    try:
+        is_active = parse_is_active(data['is_active'])
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    updated = Account.query.filter(Account.id.in_(ids)).update(
+        {'is_active': is_active, 'updated_at': datetime.utcnow()}, synchronize_session=False)
+    db.session.commit()
+    response_cache.invalidate('accounts')
+    return jsonify({'message': f"已{'启用' if is_active else '禁用'} {updated} 个账号", 'updated': updated})
+
 @app.route('/api/login/<int:account_id>', methods=['POST'])
 def manual_login(account_id):
     account = Account.query.get_or_404(account_id)
@@ -468,33 +2795,73 @@ def manual_login(account_id):
         'name': account.name
     }
     
-    # 在新线程中执行登录，避免阻塞
-    def login_thread():
-        auto_login.login_account(account_info)
-    
-    thread = threading.Thread(target=login_thread)
-    thread.start()
+    # 提交到后台任务队列执行，避免阻塞
+    def login_job(job):
+        job_queue.update_progress(job, 0, 1)
+        success = auto_login.run_isolated_login(account_info)
+        login_log_writer.flush()
+        job_queue.update_progress(job, 1, 1)
+        return {'success': bool(success), 'upstream_unavailable': success is None}
     
-    return jsonify({'message': f'正在为账号 [{account.name}] 执行登录...'})
+    return submit_job(f'account:{account.id}', f'账号 [{account.name}] 登录', login_job,
+                      f'正在为账号 [{account.name}] 执行登录...')
 
 @app.route('/api/login/all', methods=['POST'])
 def login_all_accounts():
-    # 在新线程中执行登录，避免阻塞
-    def login_thread():
-        auto_login.run_all_accounts()
-    
-    thread = threading.Thread(target=login_thread)
-    thread.start()
+    return submit_job('all', '全部账号登录', run_all_accounts_job, '正在为所有账号执行登录...')
+
+def run_all_accounts_job(job):
+    success_count, total, unavailable_count = auto_login.login_accounts(
+        progress=lambda done, total: job_queue.update_progress(job, done, total)
+    )
+    return {'success_count': success_count, 'total': total, 'upstream_unavailable': unavailable_count}
+
+def submit_job(key, description, func, message):
+    try:
+        job, created = job_queue.submit(key, description, func)
+    except queue.Full:
+        return jsonify({'message': '任务队列已满，请稍后再试'}), 429
     
-    return jsonify({'message': '正在为所有账号执行登录...'})
+    if not created:
+        return jsonify({'message': f'{description}任务已在执行中', 'job_id': job['id']}), 200
+    return jsonify({'message': message, 'job_id': job['id']}), 202
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    return jsonify(job_queue.list())
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({'message': '任务不存在'}), 404
+    return jsonify(job)
+
+# 日志分页游标：最后一条记录的 (created_at, id)
+def encode_log_cursor(log):
+    return f"{log.created_at.isoformat()}_{log.id}"
+
+def decode_log_cursor(cursor):
+    created_at, log_id = cursor.rsplit('_', 1)
+    return datetime.fromisoformat(created_at), int(log_id)
 
 @app.route('/api/logs', methods=['GET'])
+@cached_json('login_logs', 'accounts')
 def get_logs():
     date_filter = request.args.get('date')
     account_filter = request.args.get('account_id')
     status_filter = request.args.get('status')
+    cursor = request.args.get('cursor')
+    limit = max(1, min(request.args.get('limit', 100, type=int), 500))
+    fields_param = request.args.get('fields')
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()] \
+        if fields_param else list(LoginLog.LIST_FIELDS)
     
-    query = LoginLog.query
+    # 一次JOIN取出账号名称，避免逐条懒加载Account；不需要details时不从数据库读取该列
+    options = [joinedload(LoginLog.account).load_only(Account.name)]
+    if 'details' not in fields:
+        options.append(defer(LoginLog.details))
+    query = LoginLog.query.options(*options)
     
     if date_filter:
         start_date = datetime.strptime(date_filter, '%Y-%m-%d')
@@ -507,27 +2874,108 @@ def get_logs():
     if status_filter:
         query = query.filter(LoginLog.status == status_filter)
     
-    logs = query.order_by(LoginLog.created_at.desc()).limit(100).all()
-    return jsonify([log.to_dict() for log in logs])
+    if cursor:
+        try:
+            cursor_time, cursor_id = decode_log_cursor(cursor)
+        except ValueError:
+            return jsonify({'message': '无效的分页游标'}), 400
+        # 键集分页：只取游标之前的记录，created_at 上的范围条件可以直接走索引
+        query = query.filter(
+            LoginLog.created_at <= cursor_time,
+            or_(LoginLog.created_at < cursor_time, LoginLog.id < cursor_id)
+        )
+    
+    logs = query.order_by(LoginLog.created_at.desc(), LoginLog.id.desc()).limit(limit).all()
+    response = jsonify([log.to_dict(fields) for log in logs])
+    # 下一页游标放在响应头中，保持响应体仍为日志数组
+    if len(logs) == limit:
+        response.headers['X-Next-Cursor'] = encode_log_cursor(logs[-1])
+    return response
+
+@app.route('/api/logs/<int:log_id>', methods=['GET'])
+def get_log(log_id):
+    log = LoginLog.query.get_or_404(log_id)
+    return jsonify(log.to_dict())
 
 @app.route('/api/logs/clear', methods=['POST'])
 def clear_logs():
     date_filter = request.json.get('date')
     
-    query = LoginLog.query
+    criteria = []
     
     if date_filter:
         start_date = datetime.strptime(date_filter, '%Y-%m-%d')
         end_date = start_date + timedelta(days=1)
-        query = query.filter(LoginLog.created_at >= start_date, LoginLog.created_at < end_date)
+        criteria += [LoginLog.created_at >= start_date, LoginLog.created_at < end_date]
     
-    count = query.count()
-    query.delete()
-    db.session.commit()
+    # 分批删除，避免一个大事务长时间占用写锁
+    count = delete_logs_in_batches(*criteria)
+    response_cache.invalidate('login_logs')
     
     return jsonify({'message': f'已清除 {count} 条日志记录'})
 
+@app.route('/api/logs/daily', methods=['GET'])
+def get_daily_logs():
+    query = LoginLogDaily.query
+    account_filter = request.args.get('account_id', type=int)
+    if account_filter:
+        query = query.filter(LoginLogDaily.account_id == account_filter)
+    if request.args.get('start'):
+        query = query.filter(LoginLogDaily.day >= datetime.strptime(request.args['start'], '%Y-%m-%d').date())
+    if request.args.get('end'):
+        query = query.filter(LoginLogDaily.day <= datetime.strptime(request.args['end'], '%Y-%m-%d').date())
+    
+    limit = min(request.args.get('limit', 100, type=int), 1000)
+    rows = query.order_by(LoginLogDaily.day.desc(), LoginLogDaily.account_id).limit(limit).all()
+    names = dict(db.session.query(Account.id, Account.name).filter(
+        Account.id.in_({row.account_id for row in rows})).all()) if rows else {}
+    return jsonify([dict(row.to_dict(), account_name=names.get(row.account_id)) for row in rows])
+
+@app.route('/api/logs/retention', methods=['POST'])
+def run_log_retention_now():
+    def retention_job(job):
+        files = compress_log_files()
+        with app.app_context():
+            return {'rows': log_retention.run(), 'files': files}
+    return submit_job('log_retention', '登录日志归档清理', retention_job, '日志归档清理已提交执行')
+
+@app.route('/api/clubs', methods=['GET'])
+@cached_json('club_snapshots', 'accounts')
+def get_clubs():
+    # 每个账号的最新快照：按账号取最大ID，走 (account_id, id) 索引
+    latest_ids = db.session.query(func.max(ClubSnapshot.id)).group_by(ClubSnapshot.account_id)
+    snapshots = ClubSnapshot.query.options(joinedload(ClubSnapshot.account).load_only(Account.name)) \
+        .filter(ClubSnapshot.id.in_(latest_ids)).order_by(ClubSnapshot.account_id).all()
+    return jsonify([snapshot.to_dict() for snapshot in snapshots])
+
+@app.route('/api/clubs/<int:account_id>/history', methods=['GET'])
+@cached_json('club_snapshots', 'accounts')
+def get_club_history(account_id):
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    snapshots = ClubSnapshot.query.options(joinedload(ClubSnapshot.account).load_only(Account.name)) \
+        .filter_by(account_id=account_id).order_by(ClubSnapshot.id.desc()).limit(limit).all()
+    return jsonify([snapshot.to_dict() for snapshot in snapshots])
+
+@app.route('/api/stats', methods=['GET'])
+@cached_json('login_logs', 'accounts')
+def get_account_stats():
+    # 统计随日志写入增量维护，这里只按账号读取，不扫描日志表
+    query = db.session.query(Account.id, Account.name, Account.is_active, AccountStats) \
+        .outerjoin(AccountStats, AccountStats.account_id == Account.id)
+    account_filter = request.args.get('account_id', type=int)
+    if account_filter:
+        query = query.filter(Account.id == account_filter)
+    
+    results = []
+    for account_id, name, is_active, stats in query.order_by(Account.id).all():
+        if stats is None:
+            stats = AccountStats(account_id=account_id, attempts=0, successes=0, failures=0,
+                                 latency_total_ms=0, latency_count=0)
+        results.append(dict(stats.to_dict(), account_name=name, is_active=is_active))
+    return jsonify(results)
+
 @app.route('/api/email_configs', methods=['GET'])
+@cached_json('email_configs')
 def get_email_configs():
     configs = EmailConfig.query.all()
     return jsonify([config.to_dict() for config in configs])
@@ -545,6 +2993,7 @@ def add_email_config():
     )
     db.session.add(config)
     db.session.commit()
+    response_cache.invalidate('email_configs')
     return jsonify(config.to_dict())
 
 @app.route('/api/email_configs/<int:config_id>', methods=['PUT'])
@@ -558,6 +3007,7 @@ def update_email_config(config_id):
     config.receiver_email = data.get('receiver_email', config.receiver_email)
     config.is_active = data.get('is_active', config.is_active)
     db.session.commit()
+    response_cache.invalidate('email_configs')
     return jsonify(config.to_dict())
 
 @app.route('/api/email_configs/<int:config_id>', methods=['DELETE'])
@@ -565,10 +3015,10 @@ def delete_email_config(config_id):
     config = EmailConfig.query.get_or_404(config_id)
     db.session.delete(config)
     db.session.commit()
+    response_cache.invalidate('email_configs')
     return jsonify({'message': '邮件配置删除成功'})
 
-@app.route('/api/scheduler/status', methods=['GET'])
-def get_scheduler_status():
+def scheduler_status():
     jobs = []
     for job in scheduler.get_jobs():
         jobs.append({
@@ -577,12 +3027,234 @@ def get_scheduler_status():
             'next_run': job.next_run_time.isoformat() if job.next_run_time else None,
             'trigger': str(job.trigger)
         })
-    return jsonify({'jobs': jobs, 'running': scheduler.running})
+    return {'jobs': jobs, 'running': scheduler.state == STATE_RUNNING, 'leader': scheduler_leader.is_leader}
+
+@app.route('/api/scheduler/status', methods=['GET'])
+@cached_json('scheduler')
+def get_scheduler_status():
+    return jsonify(scheduler_status())
 
 @app.route('/api/scheduler/run', methods=['POST'])
 def run_scheduler_job():
-    auto_login.run_all_accounts()
-    return jsonify({'message': '定时任务执行完成'})
+    return submit_job('all', '全部账号登录', run_all_accounts_job, '定时任务已提交执行')
+
+def apply_task_fields(task, data):
+    """把请求中的字段写入定时任务，字段无效时返回错误信息"""
+    task.name = data.get('name', task.name)
+    task.description = data.get('description', task.description)
+    task.cron_expression = data.get('cron_expression', task.cron_expression)
+    task.is_active = data.get('is_active', task.is_active if task.is_active is not None else True)
+    if not task.name or not task.cron_expression:
+        return '任务名称和cron表达式不能为空'
+    try:
+        build_cron_trigger(task.cron_expression)
+    except ValueError as e:
+        return f'cron表达式无效: {str(e)}'
+    
+    if 'account_ids' in data:
+        account_ids = data['account_ids'] or []
+        if not all(isinstance(account_id, int) for account_id in account_ids):
+            return '账号ID必须是整数列表'
+        task.account_ids = ','.join(str(account_id) for account_id in account_ids) or None
+    if 'jitter_seconds' in data:
+        jitter_seconds = data['jitter_seconds'] or 0
+        if not isinstance(jitter_seconds, int) or jitter_seconds < 0:
+            return '随机推迟秒数必须是非负整数'
+        task.jitter_seconds = jitter_seconds
+    return None
+
+@app.route('/api/tasks', methods=['GET'])
+def get_tasks():
+    tasks = ScheduledTask.query.order_by(ScheduledTask.id).all()
+    return jsonify([task.to_dict() for task in tasks])
+
+@app.route('/api/tasks', methods=['POST'])
+def add_task():
+    task = ScheduledTask()
+    error = apply_task_fields(task, request.json or {})
+    if error:
+        return jsonify({'error': error}), 400
+    db.session.add(task)
+    db.session.commit()
+    sync_scheduled_tasks()
+    db.session.refresh(task)
+    return jsonify(task.to_dict())
+
+@app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+def update_task(task_id):
+    task = ScheduledTask.query.get_or_404(task_id)
+    error = apply_task_fields(task, request.json or {})
+    if error:
+        db.session.rollback()
+        return jsonify({'error': error}), 400
+    db.session.commit()
+    sync_scheduled_tasks()
+    db.session.refresh(task)
+    return jsonify(task.to_dict())
+
+@app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
+def delete_task(task_id):
+    task = ScheduledTask.query.get_or_404(task_id)
+    db.session.delete(task)
+    db.session.commit()
+    sync_scheduled_tasks()
+    return jsonify({'message': '定时任务删除成功'})
+
+# 其他进程产生的事件：有推送连接时，后台线程定期从数据库读取其他进程写入的登录日志和定时任务状态变化，
+# 发布到本进程的事件中心，使连接到任意进程的仪表盘都能收到定时任务执行产生的日志
+class SharedEventPoller:
+    def __init__(self, interval, batch_size=500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.thread = None
+        self.last_log_id = 0
+        self.scheduler_version = None
+        self.polls = 0
+        self.published = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                # 从当前位置开始，之前的日志由仪表盘首次加载时拉取
+                self.last_log_id = db.session.query(func.max(LoginLog.id)).scalar() or 0
+                self.scheduler_version = scheduler_version()
+                self.thread = threading.Thread(target=self._run, name='event-poller', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not event_broker.subscribers:
+                continue
+            try:
+                with app.app_context():
+                    self.poll()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"读取共享事件失败: {str(e)}")
+
+    def poll(self):
+        # 持有日志写入锁，本进程正在写入的日志要么已经推送，要么还未提交，不会重复推送
+        with login_log_writer.flush_lock:
+            max_id = db.session.query(func.max(LoginLog.id)).scalar() or 0
+            if max_id < self.last_log_id:
+                # 日志已被清空，从当前位置开始
+                self.last_log_id = max_id
+            rows = db.session.query(LoginLog.id, LoginLog.account_id, LoginLog.status, LoginLog.message,
+                                    LoginLog.created_at, Account.name) \
+                .outerjoin(Account, Account.id == LoginLog.account_id) \
+                .filter(LoginLog.id > self.last_log_id).order_by(LoginLog.id).limit(self.batch_size).all()
+            local_ids = set(event_broker.local_log_ids)
+            for log_id, account_id, status, message, created_at, account_name in rows:
+                self.last_log_id = log_id
+                if log_id in local_ids:
+                    continue
+                event_broker.publish('log', {
+                    'id': log_id,
+                    'account_id': account_id,
+                    'account_name': account_name,
+                    'status': status,
+                    'message': message,
+                    'created_at': created_at.isoformat()
+                })
+                self.published += 1
+        
+        version = scheduler_version()
+        if version != self.scheduler_version:
+            event_broker.publish('scheduler', scheduler_status())
+            self.published += 1
+        self.scheduler_version = version
+        self.polls += 1
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'subscribers': event_broker.subscribers,
+            'polls': self.polls,
+            'published': self.published
+        }
+
+shared_event_poller = SharedEventPoller(Config.SSE_DB_POLL_INTERVAL)
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    # SSE事件流：每个连接占用一个工作线程，使用gunicorn时需配合gthread/gevent等worker
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    cursor = event_broker.parse_event_id(last_event_id)
+    reset = last_event_id is not None and (cursor is None or not event_broker.can_resume(cursor))
+    if cursor is None or reset:
+        cursor = event_broker.last_id
+    shared_event_poller.start()
+    
+    def generate():
+        nonlocal cursor
+        event_broker.subscribe()
+        try:
+            yield 'retry: 5000\n\n'
+            if reset:
+                # 无法续传（事件已被挤出历史或来自其他进程），通知客户端重新拉取完整数据
+                yield f'id: {event_broker.event_id(cursor)}\nevent: reset\ndata: {{}}\n\n'
+            
+            deadline = time.monotonic() + Config.SSE_MAX_DURATION
+            while time.monotonic() < deadline:
+                events = event_broker.wait_for_events(cursor, Config.SSE_KEEPALIVE)
+                if not events:
+                    yield ': keep-alive\n\n'
+                    continue
+                for event_id, name, data in events:
+                    cursor = event_id
+                    yield (f'id: {event_broker.event_id(event_id)}\nevent: {name}\n'
+                           f'data: {json.dumps(data, ensure_ascii=False)}\n\n')
+        finally:
+            event_broker.unsubscribe()
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/perf/stats', methods=['GET'])
+def get_perf_stats():
+    return jsonify({
+        'http_pool': session_manager.stats(),
+        'rsa_key_cache': public_key_cache.stats(),
+        'ocr': captcha_recognizer.stats(),
+        'login': login_stats.stats(),
+        'jobs': job_queue.stats(),
+        'log_writer': login_log_writer.stats(),
+        'shared_events': shared_event_poller.stats(),
+        'log_retention': log_retention.stats(),
+        'upstream': {
+            'breaker': upstream_breaker.stats(),
+            'rate_limit': host_rate_limiter.stats(),
+            'latency': upstream_metrics.stats()
+        },
+        'session_cache': account_session_cache.stats(),
+        'club_snapshots': club_snapshot_store.stats(),
+        'email_outbox': email_outbox.stats(),
+        'response_cache': response_cache.stats(),
+        'startup': dict(startup_timings)
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    lines = upstream_metrics.prometheus()
+    
+    lines += ['# HELP login_attempts_total 登录尝试次数', '# TYPE login_attempts_total counter']
+    totals = login_stats.stats()
+    lines.append(f"login_attempts_total {totals['attempts']}")
+    lines += ['# HELP login_successes_total 登录成功次数（包括复用会话）', '# TYPE login_successes_total counter']
+    lines.append(f"login_successes_total {totals['successes']}")
+    
+    lines += ['# HELP upstream_circuit_open 上游熔断器是否处于熔断状态', '# TYPE upstream_circuit_open gauge']
+    for host, state in upstream_breaker.stats().items():
+        lines.append(f'upstream_circuit_open{{host="{host}"}} {int(state["state"] != "closed")}')
+    lines += ['# HELP upstream_rate_limit 上游当前限速(每秒请求数)', '# TYPE upstream_rate_limit gauge']
+    for host, rate in host_rate_limiter.stats().items():
+        lines.append(f'upstream_rate_limit{{host="{host}"}} {rate}')
+    
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -602,10 +3274,23 @@ def internal_error(error):
     db.session.rollback()
     return render_template('500.html'), 500
 
-# 应用关闭时清理
-atexit.register(lambda: scheduler.shutdown())
+# 应用关闭时按顺序清理：先释放领导权并关闭调度器（等待执行中的任务结束），
+# 再写入任务产生的剩余登录日志，最后发送发件箱中的邮件
+def shutdown():
+    scheduler_leader.release()
+    if scheduler.running:
+        scheduler.shutdown()
+    login_log_writer.flush()
+    email_outbox.close()
+
+atexit.register(shutdown)
+
+record_startup('total', _startup_begin)
+logger.info(f"应用启动耗时(毫秒): {dict(startup_timings)}")
 
 if __name__ == '__main__':
     init_db()
-    add_scheduled_tasks()
+    # 定时任务由取得领导权的进程加载；调试模式下重载器的父进程只监视文件变化，由实际提供服务的子进程参与选举
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_scheduler()
     app.run(host='0.0.0.0', port=10000, debug=True)
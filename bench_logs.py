@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+日志查询性能基准测试
+
+向临时SQLite数据库写入大量登录日志，测量仪表盘轮询 /api/logs 的响应延迟。
+
+用法:
+    python bench_logs.py                      # 默认写入100万条日志
+    python bench_logs.py --rows 200000        # 指定日志条数
+    python bench_logs.py --no-index           # 删除日志索引后测试，用于对比
+    python bench_logs.py --cache              # 开启响应缓存（有效期为0），测量每次请求校验数据版本的开销
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='日志查询性能基准测试')
+    parser.add_argument('--rows', type=int, default=1000000, help='写入的日志条数')
+    parser.add_argument('--accounts', type=int, default=200, help='账号数量')
+    parser.add_argument('--days', type=int, default=90, help='日志分布的天数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的重复次数')
+    parser.add_argument('--no-index', action='store_true', help='删除日志索引后测试')
+    parser.add_argument('--cache', action='store_true', help='开启响应缓存，有效期为0，每次请求都校验数据版本')
+    return parser.parse_args()
+
+
+def seed(db, Account, LoginLog, args):
+    from sqlalchemy import insert
+
+    db.session.execute(insert(Account), [
+        {'account': f'bench{i}@example.com', 'password': 'bench', 'name': f'bench{i}'}
+        for i in range(args.accounts)
+    ])
+    account_ids = [account.id for account in Account.query.all()]
+
+    start = datetime.utcnow() - timedelta(days=args.days)
+    step = timedelta(days=args.days) / args.rows
+    chunk_size = 50000
+    for offset in range(0, args.rows, chunk_size):
+        db.session.execute(insert(LoginLog), [
+            {
+                'account_id': random.choice(account_ids),
+                'status': 'success' if random.random() < 0.7 else 'failed',
+                'message': '登录成功',
+                'details': '{"iErrCode": 0}',
+                'created_at': start + step * i
+            }
+            for i in range(offset, min(offset + chunk_size, args.rows))
+        ])
+        db.session.commit()
+    return account_ids
+
+
+def measure(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    timings.sort()
+    return {
+        'p50': timings[len(timings) // 2],
+        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'max': timings[-1]
+    }
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='bench_logs_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['LOG_DIR'] = os.path.join(workdir, 'logs')
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    os.environ['WARMUP_ENABLED'] = 'false'
+    if args.cache:
+        os.environ['RESPONSE_CACHE_TTL'] = '0'
+    else:
+        os.environ['RESPONSE_CACHE_SIZE'] = '0'  # 测量查询本身，不经过响应缓存
+
+    from sqlalchemy import text
+    from app import app, db, encode_log_cursor
+    from models import Account, LoginLog
+
+    try:
+        with app.app_context():
+            db.create_all()
+            if args.no_index:
+                for index in LoginLog.__table__.indexes:
+                    db.session.execute(text(f'DROP INDEX {index.name}'))
+
+            print(f"写入 {args.rows} 条日志...")
+            started = time.perf_counter()
+            account_ids = seed(db, Account, LoginLog, args)
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+            print(f"写入完成，耗时 {time.perf_counter() - started:.1f} 秒")
+
+            middle = LoginLog.query.order_by(LoginLog.created_at.desc(), LoginLog.id.desc()) \
+                .offset(args.rows // 2).first()
+            cursor = encode_log_cursor(middle)
+            recent_day = (datetime.utcnow() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+        scenarios = [
+            ('最新日志', '/api/logs'),
+            ('按日期筛选', f'/api/logs?date={recent_day}'),
+            ('按账号筛选', f'/api/logs?account_id={account_ids[0]}'),
+            ('按状态筛选', '/api/logs?status=failed'),
+            ('按日期+状态筛选', f'/api/logs?date={recent_day}&status=failed'),
+            ('游标翻页(中间位置)', f'/api/logs?cursor={cursor}'),
+        ]
+
+        client = app.test_client()
+        print(f"\n{'查询':<20}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for name, url in scenarios:
+            result = measure(client, url, args.repeat)
+            print(f"{name:<20}{result['p50']:>10.1f}{result['p95']:>10.1f}{result['max']:>10.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
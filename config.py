@@ -1,11 +1,37 @@
 import os
 from datetime import timedelta
 
+def build_engine_options(uri, pool_size, max_overflow, pool_recycle, busy_timeout):
+    """按数据库类型生成SQLAlchemy引擎参数"""
+    if uri.startswith('sqlite'):
+        # 写锁冲突时等待 busy_timeout 秒；内存数据库使用单连接池，不设置连接池大小
+        options = {'connect_args': {'timeout': busy_timeout}}
+        if ':memory:' not in uri and uri.rstrip('/') != 'sqlite:':
+            options.update(pool_size=pool_size, max_overflow=max_overflow)
+        return options
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True
+    }
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///auto_login.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # 数据库连接配置
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)  # 连接池保持的连接数
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)  # 连接池满时额外允许的连接数
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # 连接最长使用秒数（MySQL/PostgreSQL）
+    DB_BUSY_TIMEOUT = float(os.environ.get('DB_BUSY_TIMEOUT') or 30)  # SQLite写锁冲突时的等待秒数
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'  # WAL模式下读写互不阻塞
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'  # WAL模式下NORMAL即可保证一致性
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        SQLALCHEMY_DATABASE_URI, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_BUSY_TIMEOUT
+    )
+    
     # 邮件配置
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.email.cn'
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 465)
@@ -18,9 +44,85 @@ class Config:
     # 日志配置
     LOG_DIR = os.environ.get('LOG_DIR') or 'logs'
     LOG_LEVEL = os.environ.get('LOG_LEVEL') or 'INFO'
+    LOG_FORMAT = os.environ.get('LOG_FORMAT') or 'json'  # 文件日志格式：json(每行一个JSON对象) 或 text
+    LOG_BACKUP_DAYS = int(os.environ.get('LOG_BACKUP_DAYS') or 30)  # 按日期命名的日志文件保留天数，更早的文件由日志保留任务删除
     
     # 定时任务配置
     SCHEDULER_API_ENABLED = True
     
+    # 并发登录配置
+    LOGIN_CONCURRENCY = int(os.environ.get('LOGIN_CONCURRENCY') or 4)  # 同时登录的账号数
+    LOGIN_HOST_RATE = float(os.environ.get('LOGIN_HOST_RATE') or 5)  # 每个主机每秒最多请求数，0表示不限速
+    UPSTREAM_MIN_RATE = float(os.environ.get('UPSTREAM_MIN_RATE') or 1)  # 上游返回429/5xx时限速降低的下限(每秒请求数)
+    UPSTREAM_BURST = int(os.environ.get('UPSTREAM_BURST') or 2)  # 令牌桶最多积累的请求数
+    BREAKER_WINDOW = int(os.environ.get('BREAKER_WINDOW') or 20)  # 熔断器统计失败率的最近请求数
+    BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS') or 5)  # 至少有这么多请求后才判断是否熔断
+    BREAKER_FAILURE_RATE = float(os.environ.get('BREAKER_FAILURE_RATE') or 0.5)  # 失败率达到该值时熔断
+    BREAKER_COOLDOWN = int(os.environ.get('BREAKER_COOLDOWN') or 60)  # 熔断持续秒数，之后放行一个探测请求
+    LOGIN_RUN_DEADLINE = int(os.environ.get('LOGIN_RUN_DEADLINE') or 1800)  # 单次批量登录最长运行秒数
+    
+    # HTTP连接池配置
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS') or 4)  # 缓存的主机连接池数量
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE') or 16)  # 每个主机保持的最大长连接数
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT') or 5)  # 上游请求连接超时秒数
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT') or 20)  # 上游请求读取超时秒数
+    
+    # RSA公钥解析缓存大小
+    RSA_KEY_CACHE_SIZE = int(os.environ.get('RSA_KEY_CACHE_SIZE') or 64)
+    
+    # 验证码识别服务配置
+    # 每个ONNX会话本身会使用多个CPU核，模型实例数默认与登录并发数相同，且不超过CPU核数
+    OCR_POOL_SIZE = int(os.environ.get('OCR_POOL_SIZE') or min(LOGIN_CONCURRENCY, os.cpu_count() or 1))  # OCR模型实例数量
+    OCR_TIMEOUT = float(os.environ.get('OCR_TIMEOUT') or 30)  # 单个验证码识别超时秒数
+    WARMUP_ENABLED = (os.environ.get('WARMUP_ENABLED') or 'true').lower() == 'true'  # 收到首个请求后在后台预热OCR模型和公钥
+    CAPTCHA_MIN_CONFIDENCE = float(os.environ.get('CAPTCHA_MIN_CONFIDENCE') or 0.5)  # 识别置信度低于该值时刷新验证码
+    CAPTCHA_MAX_REFRESH = int(os.environ.get('CAPTCHA_MAX_REFRESH') or 3)  # 每次登录尝试最多刷新验证码次数
+    SESSION_CACHE_TTL = int(os.environ.get('SESSION_CACHE_TTL') or 12 * 3600)  # 登录会话缓存秒数，到期前仍会先校验是否有效
+    SESSION_CACHE_FILE = os.environ.get('SESSION_CACHE_FILE') or None  # 会话缓存保存路径，为空时只保存在内存中
+    
+    # 后台任务队列配置
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS') or 2)  # 执行登录任务的工作线程数
+    JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE') or 20)  # 排队任务上限，超出时拒绝新任务
+    JOB_HISTORY_SIZE = int(os.environ.get('JOB_HISTORY_SIZE') or 200)  # 保留的已完成任务数量
+    
+    # 定时任务配置
+    SCHEDULER_RELOAD_INTERVAL = int(os.environ.get('SCHEDULER_RELOAD_INTERVAL') or 60)  # 从数据库重新同步定时任务的间隔秒数
+    SCHEDULER_MISFIRE_GRACE = int(os.environ.get('SCHEDULER_MISFIRE_GRACE') or 300)  # 错过触发时间后仍允许补执行的秒数
+    SCHEDULER_ENABLED = (os.environ.get('SCHEDULER_ENABLED') or 'true').lower() == 'true'  # 本进程是否参与定时任务领导选举
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS') or 30)  # 定时任务领导租约秒数，每1/3租约时间续期一次
+    
+    # 登录日志批量写入配置
+    LOG_FLUSH_SIZE = int(os.environ.get('LOG_FLUSH_SIZE') or 50)  # 缓存达到该条数时立即写入
+    LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL') or 2)  # 最长缓存秒数
+    
+    # 登录日志保留配置
+    LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS') or 30)  # 原始日志保留天数，0表示不清理
+    LOG_RETENTION_CRON = os.environ.get('LOG_RETENTION_CRON') or '30 3 * * *'  # 每天执行归档清理的时间
+    LOG_RETENTION_BATCH = int(os.environ.get('LOG_RETENTION_BATCH') or 1000)  # 每批归档/删除的行数
+    LOG_RETENTION_PAUSE = float(os.environ.get('LOG_RETENTION_PAUSE') or 0.05)  # 批次之间的停顿秒数
+    LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR') or os.path.join(LOG_DIR, 'archive')  # 归档文件目录
+    
+    # 服务端推送(SSE)配置
+    SSE_HISTORY_SIZE = int(os.environ.get('SSE_HISTORY_SIZE') or 500)  # 保留用于断线续传的事件数量
+    SSE_KEEPALIVE = int(os.environ.get('SSE_KEEPALIVE') or 15)  # 无事件时发送心跳的间隔秒数
+    SSE_MAX_DURATION = int(os.environ.get('SSE_MAX_DURATION') or 300)  # 单个连接最长保持秒数，到期后客户端自动重连
+    SSE_DB_POLL_INTERVAL = float(os.environ.get('SSE_DB_POLL_INTERVAL') or 5)  # 有推送连接时从数据库读取其他进程事件的间隔秒数
+    
+    # 读接口响应缓存配置
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL') or 2)  # 缓存有效秒数，到期后按数据版本重新校验
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE') or 256)  # 最多缓存的响应数量，0表示关闭缓存
+    
+    # 账号批量导入配置
+    ACCOUNT_IMPORT_CHUNK = int(os.environ.get('ACCOUNT_IMPORT_CHUNK') or 500)  # 每个事务写入的账号行数
+    ACCOUNT_IMPORT_MAX_ERRORS = int(os.environ.get('ACCOUNT_IMPORT_MAX_ERRORS') or 200)  # 响应中最多返回的错误行数
+    
+    # 日志邮件配置
+    LOG_EMAIL_ATTACHMENT_MAX = int(os.environ.get('LOG_EMAIL_ATTACHMENT_MAX') or 5 * 1024 * 1024)  # 日志附件压缩后的大致上限(字节)
+    EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT') or 30)  # SMTP连接和收发的超时秒数
+    EMAIL_MAX_RETRIES = int(os.environ.get('EMAIL_MAX_RETRIES') or 3)  # 发送失败后的最大重试次数
+    EMAIL_RETRY_BACKOFF = float(os.environ.get('EMAIL_RETRY_BACKOFF') or 10)  # 首次重试等待秒数，之后每次翻倍
+    EMAIL_IDLE_TIMEOUT = int(os.environ.get('EMAIL_IDLE_TIMEOUT') or 60)  # SMTP连接空闲多少秒后关闭
+    EMAIL_PLAIN_SMTP = (os.environ.get('EMAIL_PLAIN_SMTP') or 'false').lower() == 'true'  # 使用明文SMTP（仅用于本地测试），默认SSL
+    
     # 自动刷新间隔（秒）
     AUTO_REFRESH_INTERVAL = 20
\ No newline at end of file
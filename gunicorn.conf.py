@@ -0,0 +1,7 @@
+# gunicorn 配置：gunicorn 启动时自动读取当前目录下的本文件
+# 例: gunicorn -w 4 -k gthread --threads 8 -b 0.0.0.0:5000 app:app
+
+# worker 加载应用后参与定时任务领导选举，只有取得租约的 worker 执行定时任务
+def post_worker_init(worker):
+    from app import start_scheduler
+    start_scheduler()
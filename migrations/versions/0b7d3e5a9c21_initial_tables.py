@@ -0,0 +1,81 @@
+"""initial tables
+
+Revision ID: 0b7d3e5a9c21
+Revises: 
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7d3e5a9c21'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# 引入迁移之前的表结构；表可能已经由 db.create_all() 创建，因此只创建缺少的表
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('accounts'):
+        op.create_table(
+            'accounts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('account', sa.String(length=255), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('account')
+        )
+    if not inspector.has_table('email_configs'):
+        op.create_table(
+            'email_configs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('smtp_server', sa.String(length=255), nullable=False),
+            sa.Column('smtp_port', sa.Integer(), nullable=False),
+            sa.Column('sender_email', sa.String(length=255), nullable=False),
+            sa.Column('sender_password', sa.String(length=255), nullable=False),
+            sa.Column('receiver_email', sa.String(length=255), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('login_logs'):
+        op.create_table(
+            'login_logs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('account_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=50), nullable=False),
+            sa.Column('message', sa.Text(), nullable=True),
+            sa.Column('details', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('scheduled_tasks'):
+        op.create_table(
+            'scheduled_tasks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('cron_expression', sa.String(length=255), nullable=False),
+            sa.Column('is_active', sa.Boolean(), nullable=True),
+            sa.Column('last_run', sa.DateTime(), nullable=True),
+            sa.Column('next_run', sa.DateTime(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('scheduled_tasks')
+    op.drop_table('login_logs')
+    op.drop_table('email_configs')
+    op.drop_table('accounts')
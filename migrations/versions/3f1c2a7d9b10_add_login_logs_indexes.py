@@ -0,0 +1,31 @@
+"""add login_logs indexes
+
+Revision ID: 3f1c2a7d9b10
+Revises: 0b7d3e5a9c21
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b10'
+down_revision = '0b7d3e5a9c21'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建（包含这些索引），因此只创建缺少的索引
+def upgrade():
+    op.create_index('ix_login_logs_created_at_id', 'login_logs', ['created_at', 'id'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_login_logs_account_created_at', 'login_logs', ['account_id', 'created_at', 'id'],
+                    unique=False, if_not_exists=True)
+    op.create_index('ix_login_logs_status_created_at', 'login_logs', ['status', 'created_at', 'id'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_login_logs_status_created_at', table_name='login_logs', if_exists=True)
+    op.drop_index('ix_login_logs_account_created_at', table_name='login_logs', if_exists=True)
+    op.drop_index('ix_login_logs_created_at_id', table_name='login_logs', if_exists=True)
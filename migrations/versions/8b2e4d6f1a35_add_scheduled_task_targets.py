@@ -0,0 +1,31 @@
+"""add scheduled task account_ids and jitter_seconds
+
+Revision ID: 8b2e4d6f1a35
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a35'
+down_revision = '3f1c2a7d9b10'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建（包含这些列），因此只添加缺少的列
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('scheduled_tasks')}
+    if 'account_ids' not in columns:
+        op.add_column('scheduled_tasks', sa.Column('account_ids', sa.Text(), nullable=True))
+    if 'jitter_seconds' not in columns:
+        op.add_column('scheduled_tasks', sa.Column('jitter_seconds', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('scheduled_tasks') as batch_op:
+        batch_op.drop_column('jitter_seconds')
+        batch_op.drop_column('account_ids')
@@ -0,0 +1,39 @@
+"""add cache_versions
+
+Revision ID: a5c2e8f4b637
+Revises: f3a8d2c6b491
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c2e8f4b637'
+down_revision = 'f3a8d2c6b491'
+branch_labels = None
+depends_on = None
+
+CACHE_TABLES = ('accounts', 'email_configs', 'login_logs', 'club_snapshots')
+
+
+# 表可能已经由 db.create_all() 创建，因此只在缺少时创建；再补齐各缓存表的版本行
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('cache_versions'):
+        op.create_table(
+            'cache_versions',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+    existing = {name for (name,) in bind.execute(sa.text('SELECT name FROM cache_versions'))}
+    rows = [{'name': name, 'version': 0} for name in CACHE_TABLES if name not in existing]
+    if rows:
+        op.bulk_insert(sa.table('cache_versions', sa.column('name', sa.String), sa.column('version', sa.Integer)),
+                       rows)
+
+
+def downgrade():
+    op.drop_table('cache_versions')
@@ -0,0 +1,33 @@
+"""add scheduler_locks
+
+Revision ID: c4a9e7b2d813
+Revises: 8b2e4d6f1a35
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a9e7b2d813'
+down_revision = '8b2e4d6f1a35'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建，因此只在缺少时创建
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('scheduler_locks'):
+        op.create_table(
+            'scheduler_locks',
+            sa.Column('name', sa.String(length=64), nullable=False),
+            sa.Column('owner', sa.String(length=255), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+
+def downgrade():
+    op.drop_table('scheduler_locks')
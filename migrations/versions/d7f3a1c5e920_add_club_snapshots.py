@@ -0,0 +1,38 @@
+"""add club_snapshots
+
+Revision ID: d7f3a1c5e920
+Revises: c4a9e7b2d813
+Create Date: 2026-10-18 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7f3a1c5e920'
+down_revision = 'c4a9e7b2d813'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建，因此只在缺少时创建
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('club_snapshots'):
+        op.create_table(
+            'club_snapshots',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('account_id', sa.Integer(), nullable=False),
+            sa.Column('content_hash', sa.String(length=64), nullable=False),
+            sa.Column('data', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_club_snapshots_account_id', 'club_snapshots', ['account_id', 'id'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_club_snapshots_account_id', table_name='club_snapshots', if_exists=True)
+    op.drop_table('club_snapshots')
@@ -0,0 +1,40 @@
+"""add login_log_daily
+
+Revision ID: e1b6c8d4f257
+Revises: d7f3a1c5e920
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b6c8d4f257'
+down_revision = 'd7f3a1c5e920'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建，因此只在缺少时创建
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('login_log_daily'):
+        op.create_table(
+            'login_log_daily',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('account_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('successes', sa.Integer(), nullable=False),
+            sa.Column('failures', sa.Integer(), nullable=False),
+            sa.Column('first_at', sa.DateTime(), nullable=True),
+            sa.Column('last_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('account_id', 'day', name='uq_login_log_daily_account_day')
+        )
+    op.create_index('ix_login_log_daily_day', 'login_log_daily', ['day'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_login_log_daily_day', table_name='login_log_daily', if_exists=True)
+    op.drop_table('login_log_daily')
@@ -0,0 +1,104 @@
+"""add account_stats
+
+Revision ID: f3a8d2c6b491
+Revises: e1b6c8d4f257
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d2c6b491'
+down_revision = 'e1b6c8d4f257'
+branch_labels = None
+depends_on = None
+
+
+# 表可能已经由 db.create_all() 创建，因此只在缺少时创建；表为空时根据已有日志补齐统计
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('account_stats'):
+        op.create_table(
+            'account_stats',
+            sa.Column('account_id', sa.Integer(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('successes', sa.Integer(), nullable=False),
+            sa.Column('failures', sa.Integer(), nullable=False),
+            sa.Column('failure_reasons', sa.Text(), nullable=True),
+            sa.Column('last_attempt_at', sa.DateTime(), nullable=True),
+            sa.Column('last_success_at', sa.DateTime(), nullable=True),
+            sa.Column('last_failure_at', sa.DateTime(), nullable=True),
+            sa.Column('latency_total_ms', sa.Float(), nullable=False),
+            sa.Column('latency_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+            sa.PrimaryKeyConstraint('account_id')
+        )
+    if bind.execute(sa.text('SELECT COUNT(*) FROM account_stats')).scalar():
+        return
+    
+    stats = {}
+    
+    def entry(account_id):
+        return stats.setdefault(account_id, {
+            'account_id': account_id, 'attempts': 0, 'successes': 0, 'failures': 0, 'reasons': {},
+            'last_attempt_at': None, 'last_success_at': None, 'last_failure_at': None
+        })
+    
+    # 使用带类型的列，使SQLite返回的聚合时间也转换为datetime
+    daily = sa.table('login_log_daily', sa.column('account_id', sa.Integer), sa.column('attempts', sa.Integer),
+                     sa.column('successes', sa.Integer), sa.column('failures', sa.Integer),
+                     sa.column('last_at', sa.DateTime))
+    logs = sa.table('login_logs', sa.column('account_id', sa.Integer), sa.column('status', sa.String),
+                    sa.column('message', sa.Text), sa.column('created_at', sa.DateTime))
+    
+    # 已归档的日志只保留了每日计数
+    for account_id, attempts, successes, failures, last_at in bind.execute(
+            sa.select(daily.c.account_id, sa.func.sum(daily.c.attempts), sa.func.sum(daily.c.successes),
+                      sa.func.sum(daily.c.failures), sa.func.max(daily.c.last_at))
+            .group_by(daily.c.account_id)):
+        row = entry(account_id)
+        row.update(attempts=attempts or 0, successes=successes or 0, failures=failures or 0,
+                   last_attempt_at=last_at)
+    
+    for account_id, status, message, count, last_at in bind.execute(
+            sa.select(logs.c.account_id, logs.c.status, logs.c.message, sa.func.count(),
+                      sa.func.max(logs.c.created_at))
+            .group_by(logs.c.account_id, logs.c.status, logs.c.message)):
+        row = entry(account_id)
+        row['attempts'] += count
+        row['last_attempt_at'] = max(filter(None, (row['last_attempt_at'], last_at)), default=None)
+        if status == 'success':
+            row['successes'] += count
+            row['last_success_at'] = max(filter(None, (row['last_success_at'], last_at)), default=None)
+        else:
+            row['failures'] += count
+            reason = (message or '未知错误')[:100]
+            row['reasons'][reason] = row['reasons'].get(reason, 0) + count
+            row['last_failure_at'] = max(filter(None, (row['last_failure_at'], last_at)), default=None)
+    
+    account_ids = {account_id for (account_id,) in bind.execute(sa.text('SELECT id FROM accounts'))}
+    rows = []
+    for account_id, row in stats.items():
+        if account_id not in account_ids:
+            continue
+        reasons = dict(sorted(row.pop('reasons').items(), key=lambda item: -item[1])[:20])
+        rows.append(dict(row, failure_reasons=json.dumps(reasons, ensure_ascii=False) if reasons else None,
+                         latency_total_ms=0, latency_count=0))
+    if rows:
+        op.bulk_insert(sa.table(
+            'account_stats',
+            sa.column('account_id', sa.Integer), sa.column('attempts', sa.Integer),
+            sa.column('successes', sa.Integer), sa.column('failures', sa.Integer),
+            sa.column('failure_reasons', sa.Text), sa.column('last_attempt_at', sa.DateTime),
+            sa.column('last_success_at', sa.DateTime), sa.column('last_failure_at', sa.DateTime),
+            sa.column('latency_total_ms', sa.Float), sa.column('latency_count', sa.Integer)
+        ), rows)
+
+
+def downgrade():
+    op.drop_table('account_stats')
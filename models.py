@@ -17,6 +17,10 @@ class Account(db.Model):
     
     # 关联登录日志
     login_logs = db.relationship('LoginLog', backref='account', lazy=True)
+    # 关联俱乐部信息快照，删除账号时一并删除
+    club_snapshots = db.relationship('ClubSnapshot', backref='account', lazy=True, cascade='all, delete-orphan')
+    # 关联登录统计，删除账号时一并删除
+    stats = db.relationship('AccountStats', backref='account', uselist=False, lazy=True, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -57,6 +61,12 @@ class EmailConfig(db.Model):
 
 class LoginLog(db.Model):
     __tablename__ = 'login_logs'
+    __table_args__ = (
+        # 日志列表按 (created_at, id) 倒序分页，并按账号/状态筛选
+        db.Index('ix_login_logs_created_at_id', 'created_at', 'id'),
+        db.Index('ix_login_logs_account_created_at', 'account_id', 'created_at', 'id'),
+        db.Index('ix_login_logs_status_created_at', 'status', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
@@ -65,14 +75,109 @@ class LoginLog(db.Model):
     details = db.Column(db.Text)  # JSON格式存储详细信息
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    def to_dict(self):
-        return {
+    # 日志列表默认返回的字段，details 体积较大，需要时通过 fields 参数或详情接口获取
+    LIST_FIELDS = ('id', 'account_id', 'account_name', 'status', 'message', 'created_at')
+    
+    def to_dict(self, fields=None):
+        data = {
             'id': self.id,
             'account_id': self.account_id,
             'account_name': self.account.name if self.account else None,
             'status': self.status,
             'message': self.message,
-            'details': json.loads(self.details) if self.details else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+        if fields is None or 'details' in fields:
+            data['details'] = json.loads(self.details) if self.details else None
+        if fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        return data
+
+class LoginLogDaily(db.Model):
+    __tablename__ = 'login_log_daily'
+    __table_args__ = (
+        db.UniqueConstraint('account_id', 'day', name='uq_login_log_daily_account_day'),
+        db.Index('ix_login_log_daily_day', 'day'),
+    )
+    
+    # 超过保留期的登录日志按账号和日期汇总后保存在这里，原始日志归档到文件
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    successes = db.Column(db.Integer, nullable=False, default=0)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+    first_at = db.Column(db.DateTime)
+    last_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'day': self.day.isoformat(),
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'failures': self.failures,
+            'first_at': self.first_at.isoformat() if self.first_at else None,
+            'last_at': self.last_at.isoformat() if self.last_at else None
+        }
+
+class AccountStats(db.Model):
+    __tablename__ = 'account_stats'
+    
+    # 每个账号的登录统计，在批量写入登录日志时增量更新，不需要扫描日志表
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    successes = db.Column(db.Integer, nullable=False, default=0)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+    failure_reasons = db.Column(db.Text)  # JSON格式存储 {失败原因: 次数}
+    last_attempt_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_failure_at = db.Column(db.DateTime)
+    latency_total_ms = db.Column(db.Float, nullable=False, default=0)
+    latency_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def reasons(self):
+        return json.loads(self.failure_reasons) if self.failure_reasons else {}
+    
+    def to_dict(self):
+        return {
+            'account_id': self.account_id,
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'failures': self.failures,
+            'success_rate': round(self.successes / self.attempts, 4) if self.attempts else None,
+            'attempts_per_success': round(self.attempts / self.successes, 2) if self.successes else None,
+            'failure_reasons': self.reasons(),
+            'avg_latency_ms': round(self.latency_total_ms / self.latency_count, 1) if self.latency_count else None,
+            'last_attempt_at': self.last_attempt_at.isoformat() if self.last_attempt_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None,
+            'last_failure_at': self.last_failure_at.isoformat() if self.last_failure_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ClubSnapshot(db.Model):
+    __tablename__ = 'club_snapshots'
+    __table_args__ = (
+        # 按账号查询最新快照和历史
+        db.Index('ix_club_snapshots_account_id', 'account_id', 'id'),
+    )
+    
+    # 只在俱乐部信息内容变化时写入新快照
+    id = db.Column(db.Integer, primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id'), nullable=False)
+    content_hash = db.Column(db.String(64), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON格式存储俱乐部信息
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'account_id': self.account_id,
+            'account_name': self.account.name if self.account else None,
+            'content_hash': self.content_hash,
+            'data': json.loads(self.data),
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
@@ -83,21 +188,56 @@ class ScheduledTask(db.Model):
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     cron_expression = db.Column(db.String(255), nullable=False)
+    account_ids = db.Column(db.Text)  # 逗号分隔的账号ID，为空表示所有启用的账号
+    jitter_seconds = db.Column(db.Integer, default=0)  # 触发时间随机推迟的最大秒数
     is_active = db.Column(db.Boolean, default=True)
     last_run = db.Column(db.DateTime)
     next_run = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    def account_id_list(self):
+        if not self.account_ids:
+            return None
+        return [int(account_id) for account_id in self.account_ids.split(',') if account_id.strip()]
+    
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'cron_expression': self.cron_expression,
+            'account_ids': self.account_id_list(),
+            'jitter_seconds': self.jitter_seconds or 0,
             'is_active': self.is_active,
             'last_run': self.last_run.isoformat() if self.last_run else None,
             'next_run': self.next_run.isoformat() if self.next_run else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+
+class SchedulerLock(db.Model):
+    __tablename__ = 'scheduler_locks'
+    
+    # 多进程部署时只有持有租约的进程执行定时任务，租约靠心跳续期
+    name = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(255), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+    
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'owner': self.owner,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None
+        }
+
+
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    
+    # 读接口响应缓存的数据版本，写接口修改数据后递增对应表的版本，所有进程据此判断缓存是否过期
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
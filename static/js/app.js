@@ -1,6 +1,9 @@
 // 全局变量
 let autoRefreshInterval = null;
 let currentRefreshInterval = 0;
+let eventSource = null;
+let streamConnected = false;
+const MAX_RENDERED_LOGS = 100;
 
 // 页面加载完成后执行
 document.addEventListener('DOMContentLoaded', function() {
@@ -16,9 +19,16 @@ function initializeApp() {
     // 初始化日志
     refreshLogs();
     
-    // 初始化定时任务状态
+    // 初始化定时任务状态（推送连接断开时才轮询）
     refreshSchedulerStatus();
-    setInterval(refreshSchedulerStatus, 30000);
+    setInterval(() => {
+        if (!streamConnected) {
+            refreshSchedulerStatus();
+        }
+    }, 30000);
+    
+    // 订阅服务端推送
+    startEventStream();
     
     // 绑定事件监听器
     bindEventListeners();
@@ -88,7 +98,7 @@ function handleAutoRefreshChange() {
     
     // 设置新的定时器
     if (interval > 0) {
-        autoRefreshInterval = setInterval(refreshLogs, interval * 1000);
+        autoRefreshInterval = setInterval(pollLogs, interval * 1000);
         currentRefreshInterval = interval;
         showToast(`日志自动刷新已设置为 ${interval} 秒`, 'info');
     } else {
@@ -96,6 +106,63 @@ function handleAutoRefreshChange() {
     }
 }
 
+// 订阅服务端推送事件（SSE），连接正常时不再轮询，断开期间回退为轮询
+function startEventStream() {
+    if (eventSource || !window.EventSource) {
+        return;
+    }
+    
+    eventSource = new EventSource('/api/events');
+    eventSource.onopen = () => {
+        streamConnected = true;
+    };
+    eventSource.onerror = () => {
+        // 浏览器会自动重连，并带上 Last-Event-ID 续传
+        streamConnected = false;
+    };
+    eventSource.addEventListener('log', event => {
+        handleLogEvent(JSON.parse(event.data));
+    });
+    eventSource.addEventListener('scheduler', event => {
+        renderSchedulerStatus(JSON.parse(event.data));
+    });
+    eventSource.addEventListener('reset', () => {
+        refreshLogs();
+        refreshSchedulerStatus();
+    });
+}
+
+// 轮询日志（仅在推送连接不可用时）
+function pollLogs() {
+    if (!streamConnected) {
+        refreshLogs();
+    }
+}
+
+// 推送的新日志符合当前筛选条件时插入到列表顶部
+function handleLogEvent(log) {
+    const date = document.getElementById('log-date-filter').value;
+    const accountId = document.getElementById('log-account-filter').value;
+    const status = document.getElementById('log-status-filter').value;
+    
+    if ((date && !log.created_at.startsWith(date)) ||
+        (accountId && String(log.account_id) !== accountId) ||
+        (status && log.status !== status)) {
+        return;
+    }
+    
+    const container = document.getElementById('logs-container');
+    if (!container.querySelector('.log-entry')) {
+        container.innerHTML = '';
+    }
+    container.insertAdjacentHTML('afterbegin', renderLogEntry(log));
+    
+    const entries = container.querySelectorAll('.log-entry');
+    for (let i = MAX_RENDERED_LOGS; i < entries.length; i++) {
+        entries[i].remove();
+    }
+}
+
 // 刷新日志
 function refreshLogs() {
     const date = document.getElementById('log-date-filter').value;
@@ -136,41 +203,7 @@ function renderLogs(logs) {
         return;
     }
     
-    const logsHtml = logs.map(log => {
-        const statusClass = log.status === 'success' ? 'success' : 'danger';
-        const statusIcon = log.status === 'success' ? 'check-circle' : 'times-circle';
-        const statusText = log.status === 'success' ? '成功' : '失败';
-        const time = new Date(log.created_at).toLocaleString('zh-CN');
-        
-        return `
-            <div class="log-entry alert alert-${statusClass} alert-dismissible fade show" role="alert">
-                <div class="d-flex justify-content-between align-items-start">
-                    <div class="flex-grow-1">
-                        <div class="d-flex align-items-center mb-2">
-                            <i class="fas fa-${statusIcon} me-2"></i>
-                            <strong>${log.account_name || '未知账号'}</strong>
-                            <span class="badge bg-${statusClass} ms-2">${statusText}</span>
-                        </div>
-                        <div class="text-muted small">
-                            ${log.message || '无详细信息'}
-                        </div>
-                        ${log.details ? `
-                            <details class="mt-2">
-                                <summary class="small text-primary">查看详细信息</summary>
-                                <pre class="mt-2 p-2 bg-light rounded small">${JSON.stringify(log.details, null, 2)}</pre>
-                            </details>
-                        ` : ''}
-                    </div>
-                    <div class="text-muted small ms-3">
-                        ${time}
-                    </div>
-                </div>
-                <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
-            </div>
-        `;
-    }).join('');
-    
-    container.innerHTML = logsHtml;
+    container.innerHTML = logs.map(renderLogEntry).join('');
     
     // 添加动画效果
     const logEntries = container.querySelectorAll('.log-entry');
@@ -179,6 +212,58 @@ function renderLogs(logs) {
     });
 }
 
+// 渲染单条日志
+function renderLogEntry(log) {
+    const statusClass = log.status === 'success' ? 'success' : 'danger';
+    const statusIcon = log.status === 'success' ? 'check-circle' : 'times-circle';
+    const statusText = log.status === 'success' ? '成功' : '失败';
+    const time = new Date(log.created_at).toLocaleString('zh-CN');
+    
+    return `
+        <div class="log-entry alert alert-${statusClass} alert-dismissible fade show" role="alert">
+            <div class="d-flex justify-content-between align-items-start">
+                <div class="flex-grow-1">
+                    <div class="d-flex align-items-center mb-2">
+                        <i class="fas fa-${statusIcon} me-2"></i>
+                        <strong>${log.account_name || '未知账号'}</strong>
+                        <span class="badge bg-${statusClass} ms-2">${statusText}</span>
+                    </div>
+                    <div class="text-muted small">
+                        ${log.message || '无详细信息'}
+                    </div>
+                    <details class="mt-2" data-log-id="${log.id}" ontoggle="loadLogDetails(this)">
+                        <summary class="small text-primary">查看详细信息</summary>
+                        <pre class="mt-2 p-2 bg-light rounded small">加载中...</pre>
+                    </details>
+                </div>
+                <div class="text-muted small ms-3">
+                    ${time}
+                </div>
+            </div>
+            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+        </div>
+    `;
+}
+
+// 展开时再加载日志详细信息（列表接口默认不返回details）
+function loadLogDetails(element) {
+    if (!element.open || element.dataset.loaded) {
+        return;
+    }
+    
+    fetch(`/api/logs/${element.dataset.logId}`)
+        .then(response => response.json())
+        .then(log => {
+            element.dataset.loaded = 'true';
+            element.querySelector('pre').textContent = log.details ?
+                JSON.stringify(log.details, null, 2) : '无详细信息';
+        })
+        .catch(error => {
+            console.error('加载日志详情失败:', error);
+            element.querySelector('pre').textContent = '加载失败';
+        });
+}
+
 // 清空日志
 function clearLogs() {
     if (confirm('确定要清空日志吗？此操作不可恢复。')) {
@@ -245,9 +330,8 @@ function loginAccount(accountId) {
     })
     .then(response => response.json())
     .then(data => {
-        showToast('正在执行登录...', 'info');
-        // 5秒后自动刷新日志
-        setTimeout(refreshLogs, 5000);
+        showToast(data.message || '正在执行登录...', 'info');
+        pollJob(data.job_id);
     })
     .catch(error => {
         console.error('登录失败:', error);
@@ -266,9 +350,8 @@ function loginAllAccounts() {
     })
     .then(response => response.json())
     .then(data => {
-        showToast('正在为所有账号执行登录...', 'info');
-        // 10秒后自动刷新日志
-        setTimeout(refreshLogs, 10000);
+        showToast(data.message || '正在为所有账号执行登录...', 'info');
+        pollJob(data.job_id);
     })
     .catch(error => {
         console.error('登录失败:', error);
@@ -406,9 +489,8 @@ function runSchedulerJob() {
     })
     .then(response => response.json())
     .then(data => {
-        showToast('定时任务执行完成', 'success');
-        refreshLogs();
-        refreshSchedulerStatus();
+        showToast(data.message || '定时任务已提交执行', 'info');
+        pollJob(data.job_id);
     })
     .catch(error => {
         console.error('执行定时任务失败:', error);
@@ -416,6 +498,36 @@ function runSchedulerJob() {
     });
 }
 
+// 轮询后台任务状态，任务结束后刷新日志
+function pollJob(jobId) {
+    if (!jobId) {
+        return;
+    }
+    
+    fetch(`/api/jobs/${jobId}`)
+        .then(response => response.json())
+        .then(job => {
+            if (job.status === 'queued' || job.status === 'running') {
+                setTimeout(() => pollJob(jobId), 2000);
+                return;
+            }
+            
+            if (job.status === 'succeeded') {
+                const result = job.result || {};
+                const summary = result.total !== undefined ?
+                    `成功 ${result.success_count}/${result.total}` :
+                    (result.success ? '登录成功' : '登录失败');
+                showToast(`${job.description}完成：${summary}`, result.success === false ? 'error' : 'success');
+            } else {
+                showToast(`${job.description}失败：${job.error || '未知错误'}`, 'error');
+            }
+            refreshLogs();
+        })
+        .catch(error => {
+            console.error('查询任务状态失败:', error);
+        });
+}
+
 // 显示提示消息
 function showToast(message, type = 'info') {
     const toastEl = document.getElementById('liveToast');
@@ -463,8 +575,11 @@ function handleEmailSubmit(event) {
 
 // 启动防闲置检查
 function startAntiIdleCheck() {
-    // 每20秒发送一次健康检查请求
+    // 每20秒发送一次健康检查请求（推送连接保持时不需要）
     setInterval(() => {
+        if (streamConnected) {
+            return;
+        }
         fetch('/api/health')
             .then(response => response.json())
             .then(data => {
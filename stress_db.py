@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+数据库并发压力测试
+
+在临时SQLite数据库上同时运行多个写线程（逐条提交登录日志，模拟并发登录）
+和读线程（通过测试客户端请求 /api/logs，模拟仪表盘轮询），
+统计吞吐量、读取延迟和 database is locked 错误数。
+
+用法:
+    python stress_db.py                           # 默认 WAL 模式
+    python stress_db.py --journal-mode DELETE     # 使用SQLite默认的回滚日志模式对比
+    python stress_db.py --writers 8 --readers 8 --seconds 20
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='数据库并发压力测试')
+    parser.add_argument('--writers', type=int, default=4, help='写线程数')
+    parser.add_argument('--readers', type=int, default=4, help='读线程数')
+    parser.add_argument('--seconds', type=float, default=10, help='测试持续秒数')
+    parser.add_argument('--journal-mode', default='WAL', help='SQLite journal_mode')
+    parser.add_argument('--synchronous', default='NORMAL', help='SQLite synchronous')
+    parser.add_argument('--busy-timeout', default='5', help='写锁冲突等待秒数')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='stress_db_')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'stress.db')}"
+    os.environ['LOG_DIR'] = os.path.join(workdir, 'logs')
+    os.environ['LOG_LEVEL'] = 'WARNING'
+    os.environ['WARMUP_ENABLED'] = 'false'
+    os.environ['RESPONSE_CACHE_SIZE'] = '0'  # 每次读取都查询数据库
+    os.environ['SQLITE_JOURNAL_MODE'] = args.journal_mode
+    os.environ['SQLITE_SYNCHRONOUS'] = args.synchronous
+    os.environ['DB_BUSY_TIMEOUT'] = args.busy_timeout
+
+    from app import app, db
+    from models import Account, LoginLog
+
+    lock = threading.Lock()
+    results = {'writes': 0, 'reads': 0, 'write_errors': 0, 'read_errors': 0, 'locked': 0, 'read_latency': []}
+    stop = threading.Event()
+
+    def count(key, value=1):
+        with lock:
+            results[key] += value
+
+    def record_error(key, error):
+        count(key)
+        if 'database is locked' in str(error):
+            count('locked')
+
+    def writer(account_id):
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    db.session.add(LoginLog(account_id=account_id, status='success', message='登录成功',
+                                            details='{"iErrCode": 0}'))
+                    db.session.commit()
+                    count('writes')
+                except Exception as e:
+                    db.session.rollback()
+                    record_error('write_errors', e)
+
+    def reader():
+        client = app.test_client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                response = client.get('/api/logs?limit=100')
+                if response.status_code != 200:
+                    raise RuntimeError(response.get_data(as_text=True)[:200])
+                with lock:
+                    results['reads'] += 1
+                    results['read_latency'].append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                record_error('read_errors', e)
+
+    try:
+        with app.app_context():
+            db.create_all()
+            accounts = [Account(account=f'stress{i}@example.com', password='stress', name=f'stress{i}')
+                        for i in range(args.writers)]
+            db.session.add_all(accounts)
+            db.session.commit()
+            account_ids = [account.id for account in accounts]
+            journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+        threads = [threading.Thread(target=writer, args=(account_id,)) for account_id in account_ids]
+        threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+        print(f"journal_mode={journal_mode}，{args.writers} 个写线程，{args.readers} 个读线程，运行 {args.seconds} 秒...")
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latency = sorted(results['read_latency']) or [0]
+        print(f"写入: {results['writes'] / args.seconds:.0f} 次/秒，失败 {results['write_errors']} 次")
+        print(f"读取: {results['reads'] / args.seconds:.0f} 次/秒，失败 {results['read_errors']} 次，"
+              f"p50 {latency[len(latency) // 2]:.1f}ms，p95 {latency[int(len(latency) * 0.95)]:.1f}ms")
+        print(f"database is locked: {results['locked']} 次")
+        return 1 if results['locked'] else 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,15 @@
 
 import sys
 import os
+import tempfile
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# 测试使用临时数据库和日志目录，不影响 instance/ 和 logs/ 下的数据
+TEST_DIR = tempfile.mkdtemp(prefix='auto_login_test_')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}")
+os.environ.setdefault('LOG_DIR', os.path.join(TEST_DIR, 'logs'))
+os.environ.setdefault('WARMUP_ENABLED', 'false')
+
 def test_imports():
     """测试导入依赖"""
     try:
@@ -177,6 +184,618 @@ def test_auto_login():
         print(f"✗ 自动登录类测试失败: {e}")
         return False
 
+def test_job_queue():
+    """测试后台任务队列"""
+    try:
+        print("\n测试后台任务队列...")
+        
+        import threading
+        from app import JobQueue
+        
+        job_queue = JobQueue(workers=1, max_pending=5, history_size=10)
+        release = threading.Event()
+        
+        job, created = job_queue.submit('account:1', '测试任务', lambda job: release.wait(5) and 'done')
+        assert created
+        print("✓ 任务提交成功")
+        
+        duplicate, created = job_queue.submit('account:1', '测试任务', lambda job: None)
+        assert not created and duplicate['id'] == job['id']
+        print("✓ 相同账号的任务被去重")
+        
+        release.set()
+        for _ in range(50):
+            if job_queue.get(job['id'])['status'] == 'succeeded':
+                break
+            threading.Event().wait(0.1)
+        assert job_queue.get(job['id'])['result'] == 'done'
+        print("✓ 任务执行完成")
+        
+        print("后台任务队列测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 后台任务队列测试失败: {e}")
+        return False
+
+def test_email_outbox():
+    """测试邮件发件箱（需要aiosmtpd作为本地SMTP服务器）"""
+    try:
+        print("\n测试邮件发件箱...")
+        
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError:
+            print("- 未安装aiosmtpd，跳过")
+            return True
+        
+        import socket
+        from app import EmailOutbox
+        from models import EmailConfig
+        
+        class Handler:
+            def __init__(self):
+                self.received = []
+            
+            async def handle_DATA(self, server, session, envelope):
+                self.received.append((session.peer, envelope.rcpt_tos))
+                return '250 OK'
+        
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        handler = Handler()
+        controller = Controller(handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        try:
+            configs = [
+                EmailConfig(smtp_server='127.0.0.1', smtp_port=port, sender_email='sender@test.com',
+                            sender_password='test123', receiver_email=f'receiver{i}@test.com')
+                for i in range(2)
+            ]
+            outbox = EmailOutbox(timeout=5, max_retries=1, retry_backoff=0.1, idle_timeout=5, plain_smtp=True)
+            assert outbox.enqueue('测试邮件', '测试内容', 'test.log.gz', b'data', configs=configs)
+            assert outbox.wait_idle(10)
+            assert sorted(rcpt for _, rcpts in handler.received for rcpt in rcpts) == \
+                ['receiver0@test.com', 'receiver1@test.com']
+            assert len({peer for peer, _ in handler.received}) == 1
+            print("✓ 多个收件人通过同一连接发送")
+            outbox.close()
+        finally:
+            controller.stop()
+        
+        outbox.enqueue('测试邮件', '测试内容', configs=configs)
+        assert outbox.wait_idle(10)
+        assert outbox.stats()['retried'] == 1 and outbox.stats()['failed'] == 2
+        print("✓ 服务器不可用时重试后放弃")
+        
+        print("邮件发件箱测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 邮件发件箱测试失败: {e}")
+        return False
+
+def test_circuit_breaker():
+    """测试上游熔断器状态切换"""
+    try:
+        print("\n测试上游熔断器...")
+        
+        import time
+        from app import CircuitBreaker, UpstreamUnavailable
+        
+        url = 'https://upstream.test/api'
+        breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, cooldown=0.2)
+        breaker.before(url)
+        breaker.record(url, False)
+        breaker.record(url, False)
+        breaker.record(url, True)
+        assert not breaker.is_open(url)
+        breaker.record(url, True)
+        assert breaker.is_open(url) and breaker.stats()['upstream.test']['trips'] == 1
+        try:
+            breaker.before(url)
+            raise AssertionError('熔断中的请求没有被拒绝')
+        except UpstreamUnavailable:
+            pass
+        print("✓ 失败率达到阈值后熔断")
+        
+        time.sleep(0.25)
+        breaker.before(url)
+        assert breaker.stats()['upstream.test']['state'] == 'half_open'
+        try:
+            breaker.before(url)
+            raise AssertionError('探测期间的并发请求没有被拒绝')
+        except UpstreamUnavailable:
+            pass
+        breaker.record(url, True)
+        assert breaker.is_open(url) and breaker.stats()['upstream.test']['trips'] == 2
+        print("✓ 冷却后只放行一个探测请求，探测失败重新熔断")
+        
+        time.sleep(0.25)
+        breaker.before(url)
+        breaker.record(url, False)
+        assert breaker.stats()['upstream.test'] == {'state': 'closed', 'calls': 0, 'failure_rate': 0, 'trips': 2}
+        print("✓ 探测成功后关闭熔断")
+        
+        print("上游熔断器测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 上游熔断器测试失败: {e}")
+        return False
+
+def test_response_cache():
+    """测试列表接口的ETag和304响应"""
+    try:
+        print("\n测试响应缓存...")
+        
+        from app import app, init_db
+        
+        init_db()
+        client = app.test_client()
+        
+        first = client.get('/api/accounts')
+        etag = first.headers.get('ETag')
+        assert first.status_code == 200 and etag
+        cached = client.get('/api/accounts', headers={'If-None-Match': etag})
+        assert cached.status_code == 304 and not cached.data
+        print("✓ 数据未变化时返回304")
+        
+        created = client.post('/api/accounts', json={'account': 'cache@test.com', 'password': 'test123',
+                                                     'name': '缓存测试'})
+        assert created.status_code == 200
+        changed = client.get('/api/accounts', headers={'If-None-Match': etag})
+        assert changed.status_code == 200 and changed.headers.get('ETag') != etag
+        assert any(account['account'] == 'cache@test.com' for account in changed.get_json())
+        print("✓ 写入后缓存失效并返回新数据")
+        
+        print("响应缓存测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 响应缓存测试失败: {e}")
+        return False
+
+def test_account_import():
+    """测试账号导入的错误报告"""
+    try:
+        print("\n测试账号导入...")
+        
+        import json
+        from app import app, init_db
+        
+        init_db()
+        client = app.test_client()
+        
+        body = '\n'.join([
+            json.dumps({'account': 'import@test.com', 'password': 'test123', 'name': '导入测试'}),
+            json.dumps({'account': 'nopassword@test.com'}),
+            '{not json'
+        ])
+        response = client.post('/api/accounts/import?format=json', data=body.encode('utf-8'),
+                               content_type='application/json')
+        result = response.get_json()
+        assert response.status_code == 200, result
+        assert result['total'] == 3 and result['created'] == 1 and result['failed'] == 2, result
+        assert [error['line'] for error in result['errors']] == [2, 3], result
+        assert 'password' in result['errors'][0]['error']
+        print("✓ 导入结果报告出错的行号和原因")
+        
+        accounts = client.get('/api/accounts').get_json()
+        assert next(account for account in accounts if account['account'] == 'import@test.com')['name'] == '导入测试'
+        print("✓ 有效行已写入")
+        
+        print("账号导入测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 账号导入测试失败: {e}")
+        return False
+
+def test_account_stats():
+    """测试写入登录日志后账号统计的增量更新"""
+    try:
+        print("\n测试登录统计...")
+        
+        from app import app, init_db, login_log_writer
+        
+        init_db()
+        client = app.test_client()
+        
+        account_id = client.post('/api/accounts', json={'account': 'stats@test.com', 'password': 'test123',
+                                                        'name': '统计测试'}).get_json()['id']
+        before = client.get(f'/api/stats?account_id={account_id}').get_json()[0]
+        assert before['attempts'] == 0
+        
+        login_log_writer.add(account_id=account_id, status='success', message='登录成功', latency_ms=100.0)
+        login_log_writer.add(account_id=account_id, status='failed', message='验证码错误', latency_ms=50.0)
+        login_log_writer.add(account_id=account_id, status='failed', message='验证码错误')
+        login_log_writer.flush()
+        
+        after = client.get(f'/api/stats?account_id={account_id}').get_json()[0]
+        assert (after['attempts'], after['successes'], after['failures']) == (3, 1, 2), after
+        assert after['failure_reasons'] == {'验证码错误': 2}, after
+        print("✓ 写入登录日志后统计增量更新")
+        
+        print("登录统计测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 登录统计测试失败: {e}")
+        return False
+
+def test_scheduled_task_api():
+    """测试调度器未启动的进程也能增删改定时任务"""
+    try:
+        print("\n测试定时任务接口...")
+        
+        from app import app, init_db, scheduler
+        
+        init_db()
+        client = app.test_client()
+        assert not scheduler.running
+        
+        response = client.post('/api/tasks', json={'name': '测试任务', 'cron_expression': '0 8 * * *'})
+        task = response.get_json()
+        assert response.status_code == 200, task
+        assert task['next_run'], task
+        print("✓ 创建任务并计算下次运行时间")
+        
+        response = client.put(f"/api/tasks/{task['id']}", json={'cron_expression': '30 9 * * *'})
+        updated = response.get_json()
+        assert response.status_code == 200 and updated['next_run'] != task['next_run'], updated
+        print("✓ 修改cron表达式后更新下次运行时间")
+        
+        assert client.delete(f"/api/tasks/{task['id']}").status_code == 200
+        assert scheduler.get_jobs() == []
+        print("✓ 删除任务，调度器中没有遗留任务")
+        
+        print("定时任务接口测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 定时任务接口测试失败: {e}")
+        return False
+
+def test_login_log_writer():
+    """测试登录日志批量写入"""
+    try:
+        print("\n测试登录日志批量写入...")
+        
+        import time
+        from app import app, init_db, db, LoginLogWriter, event_broker
+        from models import Account, LoginLog
+        
+        init_db()
+        with app.app_context():
+            account = Account(account='writer@test.com', password='test123', name='批量写入测试')
+            db.session.add(account)
+            db.session.commit()
+            account_id = account.id
+        
+        writer = LoginLogWriter(flush_size=3, flush_interval=60)
+        writer.add(account_id=account_id, status='success', message='批量写入-0')
+        writer.add(account_id=account_id, status='failed', message='批量写入-1')
+        assert writer.stats()['buffered'] == 2 and writer.stats()['rows_written'] == 0
+        writer.add(account_id=account_id, status='failed', message='批量写入-2')
+        for _ in range(50):
+            if writer.stats()['rows_written'] == 3:
+                break
+            time.sleep(0.1)
+        assert writer.stats()['rows_written'] == 3 and writer.stats()['flushes'] == 1, writer.stats()
+        print("✓ 达到批量大小后一次写入")
+        
+        with app.app_context():
+            ids = dict(db.session.query(LoginLog.message, LoginLog.id)
+                       .filter(LoginLog.message.like('批量写入-%')).all())
+        published = {data['message']: data['id'] for _, event, data in event_broker.history
+                     if event == 'log' and data['message'].startswith('批量写入-')}
+        assert published == ids and len(ids) == 3, (published, ids)
+        print("✓ 推送的日志ID与写入的行一致")
+        
+        writer.add(account_id=None, status='failed', message='缺少账号')
+        writer.add(account_id=account_id, status='success', message='批量写入-3')
+        assert writer.flush() == 1 and writer.stats()['dropped'] == 1
+        print("✓ 违反约束的行被丢弃，同批其他行正常写入")
+        
+        print("登录日志批量写入测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 登录日志批量写入测试失败: {e}")
+        return False
+
+def test_log_retention():
+    """测试过期登录日志的汇总、归档和删除"""
+    try:
+        print("\n测试登录日志保留...")
+        
+        import gzip
+        import json
+        from datetime import datetime, timedelta
+        from app import app, init_db, db, LogRetention
+        from models import Account, LoginLog, LoginLogDaily
+        
+        init_db()
+        archive_dir = os.path.join(TEST_DIR, 'archive')
+        retention = LogRetention(retention_days=30, archive_dir=archive_dir, batch_size=2, pause=0)
+        day = datetime(2026, 1, 1, 8, 0)
+        with app.app_context():
+            account = Account(account='retention@test.com', password='test123', name='保留测试')
+            db.session.add(account)
+            db.session.commit()
+            account_id = account.id
+            for i, status in enumerate(['success', 'failed', 'failed']):
+                db.session.add(LoginLog(account_id=account_id, status=status, message=f'保留-{i}',
+                                        created_at=day + timedelta(minutes=i)))
+            db.session.commit()
+            cutoff = day + timedelta(days=1)
+            
+            def fail_rollup(rows):
+                raise RuntimeError('模拟提交失败')
+            
+            rollup, retention._rollup = retention._rollup, fail_rollup
+            try:
+                retention.run(cutoff)
+                raise AssertionError('提交失败没有抛出异常')
+            except RuntimeError:
+                pass
+            retention._rollup = rollup
+            assert LoginLog.query.filter_by(account_id=account_id).count() == 3
+            assert os.listdir(archive_dir) == []
+            print("✓ 提交失败时日志保留在表中且不写入归档")
+            
+            assert retention.run(cutoff) == 3
+            assert LoginLog.query.filter_by(account_id=account_id).count() == 0
+            daily = LoginLogDaily.query.filter_by(account_id=account_id).one()
+            assert (daily.attempts, daily.successes, daily.failures) == (3, 1, 2)
+            archive = os.path.join(archive_dir, 'login_logs_2026-01-01.jsonl.gz')
+            assert os.listdir(archive_dir) == [os.path.basename(archive)]
+            with gzip.open(archive, 'rt', encoding='utf-8') as f:
+                assert [json.loads(line)['message'] for line in f] == ['保留-0', '保留-1', '保留-2']
+            print("✓ 汇总到每日统计，归档后删除原始日志")
+            
+            # 中断在提交之后、追加归档之前留下的归档段，下次运行时补上
+            with gzip.open(f"{archive}.999999.pending", 'wt', encoding='utf-8') as f:
+                f.write(json.dumps({'id': 999999, 'message': '保留-3'}, ensure_ascii=False) + "\n")
+            retention.run(cutoff)
+            with gzip.open(archive, 'rt', encoding='utf-8') as f:
+                assert [json.loads(line)['message'] for line in f][-1] == '保留-3'
+            assert os.listdir(archive_dir) == [os.path.basename(archive)]
+            print("✓ 已提交的归档段在下次运行时追加")
+        
+        print("登录日志保留测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 登录日志保留测试失败: {e}")
+        return False
+
+def test_concurrent_login():
+    """测试多账号并发登录"""
+    try:
+        print("\n测试多账号并发登录...")
+        
+        import threading
+        import time
+        from app import app, init_db, db, AutoLogin, UpstreamUnavailable
+        from models import Account
+        
+        init_db()
+        with app.app_context():
+            accounts = [Account(account=f'runner{i}@test.com', password='test123', name=f'并发测试{i}',
+                                is_active=i < 4) for i in range(5)]
+            db.session.add_all(accounts)
+            db.session.commit()
+            account_ids = [account.id for account in accounts]
+        
+        lock = threading.Lock()
+        running = [0, 0]  # 当前并发数、最大并发数
+        
+        def fake_login(self, account_info, deadline=None):
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.2)
+            with lock:
+                running[0] -= 1
+            if account_info['name'] == '并发测试2':
+                raise UpstreamUnavailable('模拟上游不可用')
+            return account_info['name'] != '并发测试3'
+        
+        original = AutoLogin.login_account
+        AutoLogin.login_account = fake_login
+        try:
+            runner = AutoLogin()
+            runner.send_log_email = lambda: None
+            progress = []
+            started = time.perf_counter()
+            result = runner.login_accounts(progress=lambda done, total: progress.append((done, total)),
+                                           account_ids=account_ids)
+            elapsed = time.perf_counter() - started
+            assert result == (2, 4, 1), result
+            assert running[1] > 1 and elapsed < 0.8, (running, elapsed)
+            assert progress[-1] == (4, 4) and len(progress) == 4, progress
+            print("✓ 启用的账号并发登录，分别统计成功和上游不可用的账号")
+            
+            assert runner.run_all_accounts(account_ids=account_ids[:2]) == (2, 2)
+            print("✓ run_all_accounts 返回 (成功数, 总数)")
+        finally:
+            AutoLogin.login_account = original
+        
+        print("多账号并发登录测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 多账号并发登录测试失败: {e}")
+        return False
+
+def test_event_stream():
+    """测试SSE事件推送和其他进程日志的转发"""
+    try:
+        print("\n测试事件推送...")
+        
+        from datetime import datetime
+        from sqlalchemy import insert
+        from app import app, init_db, db, event_broker, shared_event_poller, login_log_writer
+        from models import Account, LoginLog
+        
+        init_db()
+        client = app.test_client()
+        
+        response = client.get('/api/events?last_event_id=otherprocess-5', buffered=False)
+        stream = (chunk.decode('utf-8') for chunk in response.response)
+        assert next(stream).startswith('retry:')
+        assert 'event: reset' in next(stream)
+        print("✓ 其他进程的事件ID无法续传，通知客户端重新拉取")
+        
+        event_broker.publish('job', {'id': 'test'})
+        chunk = next(stream)
+        assert f'id: {event_broker.event_id(event_broker.last_id)}' in chunk and 'event: job' in chunk, chunk
+        assert event_broker.subscribers == 1
+        print("✓ 新事件推送给已连接的客户端")
+        
+        with app.app_context():
+            account = Account(account='events@test.com', password='test123', name='推送测试')
+            db.session.add(account)
+            db.session.commit()
+            login_log_writer.add(account_id=account.id, status='success', message='本进程日志')
+            login_log_writer.flush()
+            # 模拟其他进程直接写入数据库的日志
+            db.session.execute(insert(LoginLog), [{'account_id': account.id, 'status': 'failed',
+                                                   'message': '其他进程日志', 'created_at': datetime.utcnow()}])
+            db.session.commit()
+            last_id = event_broker.last_id
+            shared_event_poller.poll()
+        published = [data['message'] for event_id, name, data in event_broker.history
+                     if event_id > last_id and name == 'log']
+        assert published == ['其他进程日志'], published
+        print("✓ 其他进程写入的日志转发给本进程的客户端，本进程的日志不重复推送")
+        
+        response.close()
+        assert event_broker.subscribers == 0
+        
+        print("事件推送测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 事件推送测试失败: {e}")
+        return False
+
+def test_session_reuse():
+    """测试登录会话缓存和会话复用"""
+    try:
+        print("\n测试会话复用...")
+        
+        import time
+        from app import app, init_db, db, AutoLogin, AccountSessionCache, account_session_cache
+        from models import Account
+        
+        path = os.path.join(TEST_DIR, 'sessions.json')
+        info = {'id': 1, 'account': 'session@test.com', 'password': 'test123', 'name': '会话测试'}
+        cache = AccountSessionCache(ttl=60, path=path)
+        cache.put(info, 'token', {'JSESSIONID': 'abc'})
+        assert AccountSessionCache(ttl=60, path=path).get(info)['token'] == 'token'
+        assert cache.get(dict(info, password='changed')) is None
+        expired = AccountSessionCache(ttl=0)
+        expired.put(info, 'token', {})
+        assert expired.get(info) is None and expired.stats()['invalidated'] == 1
+        print("✓ 会话缓存持久化，密码修改或过期后不再使用")
+        
+        init_db()
+        with app.app_context():
+            account = Account(account='session@test.com', password='test123', name='会话测试')
+            db.session.add(account)
+            db.session.commit()
+            info['id'] = account.id
+            
+            def no_login():
+                raise AssertionError('会话有效时不应重新登录')
+            
+            checked = []
+            
+            def get_club_list(token, account_name):
+                checked.append(token)
+                return {'clubs': []} if token == 'valid' else None
+            
+            login = AutoLogin()
+            login.get_token = no_login
+            login.get_club_list = get_club_list
+            account_session_cache.put(info, 'valid', {})
+            assert login.login_account(info) is True
+            print("✓ 缓存的会话有效时跳过完整登录")
+            
+            assert login.login_account(info, deadline=time.monotonic() - 1) is False
+            assert checked == ['valid'], checked
+            print("✓ 超过运行截止时间后不再校验缓存的会话")
+            
+            account_session_cache.put(info, 'stale', {})
+            assert login.reuse_session(info) is False
+            assert account_session_cache.get(info) is None
+            print("✓ 会话失效时从缓存中移除")
+        
+        print("会话复用测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 会话复用测试失败: {e}")
+        return False
+
+def test_daily_log_files():
+    """测试按日期写入日志文件和旧日志文件的压缩清理"""
+    try:
+        print("\n测试日志文件...")
+        
+        import gzip
+        import logging
+        from datetime import date, timedelta
+        from app import DailyFileHandler, compress_log_files, find_log_file, log_file_path
+        
+        def write(handler, message):
+            handler.handle(logging.LogRecord('test', logging.INFO, __file__, 0, message, None, None))
+        
+        today = date.today()
+        workers = [DailyFileHandler(), DailyFileHandler()]
+        try:
+            for handler in workers:
+                handler.setFormatter(logging.Formatter('%(message)s'))
+            write(workers[0], '进程A')
+            write(workers[1], '进程B')
+            # 进程A还停留在前一天的文件，下一次写入时应切换到当天的文件
+            yesterday = (today - timedelta(days=1)).isoformat()
+            workers[0].stream.close()
+            workers[0].stream = None
+            workers[0].day, workers[0].baseFilename = yesterday, log_file_path(yesterday)
+            write(workers[0], '进程A跨天')
+        finally:
+            for handler in workers:
+                handler.close()
+        with open(log_file_path(today.isoformat()), encoding='utf-8') as f:
+            lines = [line for line in f.read().splitlines() if line.startswith('进程')]
+        assert lines == ['进程A', '进程B', '进程A跨天'], lines
+        assert not os.path.exists(log_file_path(yesterday))
+        print("✓ 多个处理器追加写入同一个当天的文件，日期变化后切换文件")
+        
+        expired = (today - timedelta(days=10)).isoformat()
+        for day in (yesterday, expired):
+            with open(log_file_path(day), 'w', encoding='utf-8') as f:
+                f.write(f'{day} 日志\n')
+        assert compress_log_files(backup_days=7, today=today) == 2
+        assert find_log_file(yesterday) == f'{log_file_path(yesterday)}.gz'
+        with gzip.open(find_log_file(yesterday), 'rt', encoding='utf-8') as f:
+            assert f.read() == f'{yesterday} 日志\n'
+        assert not os.path.exists(log_file_path(expired)) and find_log_file(expired) is None
+        assert find_log_file(today.isoformat()) == log_file_path(today.isoformat())
+        print("✓ 之前日期的文件被压缩，超过保留天数的文件被删除，当天文件不受影响")
+        
+        print("日志文件测试通过！")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 日志文件测试失败: {e}")
+        return False
+
 def main():
     """主测试函数"""
     print("=" * 50)
@@ -188,7 +807,20 @@ def main():
         test_app_creation,
         test_models,
         test_routes,
-        test_auto_login
+        test_auto_login,
+        test_job_queue,
+        test_email_outbox,
+        test_circuit_breaker,
+        test_response_cache,
+        test_account_import,
+        test_account_stats,
+        test_scheduled_task_api,
+        test_login_log_writer,
+        test_log_retention,
+        test_concurrent_login,
+        test_event_stream,
+        test_session_reuse,
+        test_daily_log_files
     ]
     
     passed = 0